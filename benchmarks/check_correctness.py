@@ -0,0 +1,307 @@
+# Assertion-based correctness checks of the numerical paths the benchmarks time:
+# resampling, the summary statistics, the CSV text against pandas, the Touchstone
+# layout, cancelled exports, and the caches around appended runs and further items. Like run_benchmarks.py it uses the
+# synthetic cst.results module in fake_cst/, so it runs without CST installed.
+#
+#   python benchmarks/check_correctness.py
+#
+# Every check is run and reported; the exit status is 1 if any of them failed.
+import io
+import os
+import sys
+import glob
+import tempfile
+import traceback
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, 'fake_cst'))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np
+import pandas as pd
+import cst2csv
+
+def random_sweep(rng, n_runs=6, n_freq=40, labels=("S11",), dtype=np.complex128, nan_runs=()):
+    s_params = {}
+    for label in labels:
+        values = (rng.normal(size=(n_runs, n_freq)) + 1j * rng.normal(size=(n_runs, n_freq))) * 0.5
+        values = values.astype(dtype)
+        for run_idx in nan_runs:
+            values[run_idx, :3] = np.nan
+        s_params[label] = values
+    params = {'L': np.round(rng.uniform(1, 20, n_runs), 3), 'W': np.arange(n_runs) % 3 * 1.5}
+    return cst2csv.SweepData(np.linspace(1.0, 4.0, n_freq), s_params, params, np.arange(1, n_runs + 1))
+
+def interp_run(axis, values, grid):
+    # np.interp of the real and imaginary parts, NaN outside the run's range
+    resampled = np.interp(grid, axis, values.real) + 1j * np.interp(grid, axis, values.imag)
+    resampled[(grid < axis[0]) | (grid > axis[-1])] = np.nan
+    return resampled
+
+def check_resample_runs(rng, work_dir):
+    axes = [np.sort(np.concatenate([[start, stop], rng.uniform(start, stop, n)]))
+            for start, stop, n in [(1.0, 4.0, 30), (1.2, 3.5, 7), (0.8, 4.2, 55), (1.0, 4.0, 1)]]
+    values = [rng.normal(size=len(axis)) + 1j * rng.normal(size=len(axis)) for axis in axes]
+    grid = np.linspace(0.5, 4.5, 301)
+    out = np.empty((len(axes), len(grid)), dtype=complex)
+    cst2csv.resample_runs(axes, values, grid, out)
+    for i, (axis, run_values) in enumerate(zip(axes, values)):
+        np.testing.assert_allclose(out[i], interp_run(axis, run_values, grid), rtol=1e-12, atol=1e-12)
+
+    shared = np.array([rng.normal(size=len(axes[0])) + 1j * rng.normal(size=len(axes[0])) for _ in range(5)])
+    out = np.empty((5, len(grid)), dtype=complex)
+    cst2csv.resample_shared(axes[0], shared, grid, out)
+    for i in range(5):
+        np.testing.assert_allclose(out[i], interp_run(axes[0], shared[i], grid), rtol=1e-12, atol=1e-12)
+
+def check_frequency_grids(rng, work_dir):
+    axes = [np.linspace(1.0, 4.0, 11), np.linspace(1.5, 3.0, 31), np.linspace(0.5, 3.5, 21)]
+    run_ids = np.array([4, 7, 9])
+    grid = cst2csv.common_frequency_grid(axes, run_ids)
+    np.testing.assert_array_equal(grid, np.linspace(1.5, 3.0, 31))
+    np.testing.assert_array_equal(cst2csv.common_frequency_grid(axes, run_ids, ("Reference Run", 9)), axes[2])
+    np.testing.assert_array_equal(cst2csv.common_frequency_grid(axes, run_ids, ("Union",)),
+                                  np.unique(np.concatenate(axes)))
+    large = [np.sort(rng.uniform(1, 4, cst2csv.MAX_UNION_GRID_POINTS // 2)) for _ in range(3)]
+    try:
+        cst2csv.common_frequency_grid(large, np.arange(3), ("Union",))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a union grid above MAX_UNION_GRID_POINTS was not refused")
+
+def naive_summary(frequencies, s_params, threshold_db=cst2csv.BANDWIDTH_THRESHOLD_DB):
+    # Per-run loop over the dB values, walking out from the minimum to the threshold
+    rows = []
+    for run in s_params:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            db = 20 * np.log10(np.abs(run))
+        db = np.where(np.isnan(db), np.inf, db)
+        idx = int(np.argmin(db))
+        band = (np.nan, np.nan)
+        if db[idx] <= threshold_db:
+            lo = hi = idx
+            while lo > 0 and db[lo - 1] <= threshold_db:
+                lo -= 1
+            while hi < len(db) - 1 and db[hi + 1] <= threshold_db:
+                hi += 1
+            band = (frequencies[lo], frequencies[hi])
+        rows.append((db[idx], frequencies[idx]) + band)
+    return np.array(rows)
+
+def check_compute_summary(rng, work_dir):
+    sweep = random_sweep(rng, n_runs=cst2csv.SUMMARY_BLOCK_RUNS + 7, n_freq=200, nan_runs=(2,))
+    # A deep resonance per run so that the bands are not trivial
+    f0 = rng.uniform(1.5, 3.5, sweep.n_runs)
+    sweep.items['S11'] *= 1 - 0.95 * np.exp(-((sweep.frequencies - f0[:, None]) / 0.1) ** 2)
+    stats = cst2csv.compute_summary(sweep.frequencies, sweep.s_params)
+    expected = naive_summary(sweep.frequencies, sweep.s_params)
+    np.testing.assert_allclose(stats['min_db'], expected[:, 0], rtol=1e-9)
+    np.testing.assert_array_equal(stats['min_freq'], expected[:, 1])
+    np.testing.assert_array_equal(stats['band_start'], expected[:, 2])
+    np.testing.assert_array_equal(stats['band_end'], expected[:, 3])
+    assert stats['best_run'] == int(np.argmin(expected[:, 0]))
+
+    split = 5
+    merged = cst2csv.append_summary(cst2csv.compute_summary(sweep.frequencies, sweep.s_params[:split]),
+                                    cst2csv.compute_summary(sweep.frequencies, sweep.s_params[split:]))
+    for key, values in stats.items():
+        np.testing.assert_array_equal(merged[key], values)
+
+def pandas_csv(columns):
+    text = io.StringIO()
+    pd.DataFrame(columns).to_csv(text, index=False)
+    return text.getvalue()
+
+def check_csv_against_pandas(rng, work_dir):
+    # The default CSV text is byte-identical to pandas for double and single precision
+    # sweeps, missing values, text parameters and several projects
+    path = os.path.join(work_dir, 'check.csv')
+    for dtype in (np.complex128, np.complex64):
+        sweep = random_sweep(rng, labels=("S11", "S21"), dtype=dtype, nan_runs=(1,))
+        for display_mode in cst2csv.VALUE_COLUMNS:
+            cst2csv.write_csv_streaming(path, sweep, display_mode, chunk_rows=70)
+            with open(path) as f:
+                assert f.read() == pandas_csv(cst2csv.build_export_columns(sweep, display_mode)), \
+                    f"long CSV of {np.dtype(dtype).name} differs from pandas in {display_mode}"
+            cst2csv.write_csv_streaming(path, sweep, display_mode, chunk_rows=70, layout="Wide")
+            wide = {}
+            for _, _, columns in cst2csv.iter_wide_chunks(sweep, display_mode, chunk_rows=10 ** 9):
+                wide = columns
+            with open(path) as f:
+                assert f.read() == pandas_csv(wide), \
+                    f"wide CSV of {np.dtype(dtype).name} differs from pandas in {display_mode}"
+
+    text_params = random_sweep(rng)
+    text_params.param_values['Name'] = np.array(['a', 'b,c', 'say "hi"', 'd', 'e', 'f'])
+    other = random_sweep(rng, n_runs=3)
+    projects = cst2csv.ProjectSweeps([('first', text_params), ('second', other)])
+    cst2csv.write_csv_streaming(path, projects, "Magnitude", chunk_rows=50)
+    expected = pd.concat([pd.DataFrame(columns) for _, _, columns in
+                          projects.iter_export_chunks("Magnitude", chunk_rows=50)], ignore_index=True)
+    with open(path) as f:
+        assert f.read() == pandas_csv(expected), "merged CSV differs from pandas"
+
+    sweep = random_sweep(rng)
+    precision = {'frequency': 9, 'parameters': 6, 'values': 5}
+    cst2csv.write_csv_streaming(path, sweep, "Magnitude and Phase", precision=precision)
+    written = pd.read_csv(path)
+    for name, values in cst2csv.build_export_columns(sweep, "Magnitude and Phase").items():
+        np.testing.assert_allclose(written[name], values, rtol=1e-4)
+
+def read_touchstone(path):
+    with open(path) as f:
+        lines = f.read().splitlines()
+    comments = [line for line in lines if line.startswith('!')]
+    option = [line for line in lines if line.startswith('#')]
+    numbers = [float(token) for line in lines if line and line[0] not in '!#' for token in line.split()]
+    return comments, option, lines, np.array(numbers)
+
+def check_touchstone_layout(rng, work_dir):
+    for n_ports in (1, 2, 4):
+        labels = [f"S{i}{j}" for i in range(1, n_ports + 1) for j in range(1, n_ports + 1)]
+        sweep = random_sweep(rng, n_runs=3, n_freq=5, labels=labels)
+        path = os.path.join(work_dir, f"ts{n_ports}.s{n_ports}p")
+        assert cst2csv.write_touchstone(path, sweep, "Complex (Real + Imaginary)", max_workers=1)
+        # Two ports are written S11 S21 S12 S22; more ports row by row (Si1 .. SiN)
+        order = ["S11", "S21", "S12", "S22"] if n_ports == 2 else labels
+        for run_idx, run_id in enumerate(sweep.run_ids):
+            comments, option, lines, numbers = read_touchstone(
+                os.path.join(work_dir, f"ts{n_ports}_run{run_id}.s{n_ports}p"))
+            assert option == [f"# GHZ S RI R {cst2csv.TOUCHSTONE_REFERENCE_OHMS}"], option
+            assert f"! Run ID: {run_id}" in comments
+            assert all(f"! {name} = {value}" in comments
+                       for name, value in sweep.run_parameters(run_idx).items())
+            table = numbers.reshape(sweep.n_freq, 1 + 2 * n_ports ** 2)
+            np.testing.assert_allclose(table[:, 0], sweep.frequencies, rtol=1e-9)
+            for k, label in enumerate(order):
+                values = sweep.items[label][run_idx]
+                np.testing.assert_allclose(table[:, 1 + 2 * k], values.real, rtol=1e-8)
+                np.testing.assert_allclose(table[:, 2 + 2 * k], values.imag, rtol=1e-8)
+            data_lines = [line for line in lines if line and line[0] not in '!#']
+            # One line per point up to two ports, else one line per matrix row (at most 4 pairs)
+            assert len(data_lines) == sweep.n_freq * (1 if n_ports <= 2 else n_ports)
+            assert max(len(line.split()) for line in data_lines) <= 1 + 2 * max(n_ports ** 2 if n_ports <= 2 else 4, 1)
+
+    # A cancelled re-export leaves the files of an earlier export untouched
+    sweep = random_sweep(rng, n_runs=40, n_freq=5)
+    path = os.path.join(work_dir, 'again.s1p')
+    assert cst2csv.write_touchstone(path, sweep, "Magnitude", max_workers=1, runs_per_task=8)
+    before = {name: open(name).read() for name in glob.glob(os.path.join(work_dir, 'again_run*'))}
+    assert len(before) == sweep.n_runs
+    assert cst2csv.write_touchstone(path, sweep, "Magnitude (dB)", progress_callback=lambda done, total: False,
+                                    max_workers=1, runs_per_task=8) is False
+    after = {name: open(name).read() for name in glob.glob(os.path.join(work_dir, 'again_run*'))}
+    assert after == before, "a cancelled Touchstone export changed the files of an earlier export"
+
+def check_cancelled_exports(rng, work_dir):
+    # An export that is cancelled or fails leaves an existing file at its path untouched
+    # and no temporary file behind, including the row files of streamed Excel sheets
+    sweep = random_sweep(rng, n_runs=12)
+    excel_temp_files = set(glob.glob(os.path.join(tempfile.gettempdir(), 'openpyxl.*')))
+
+    def fail(done, total):
+        raise RuntimeError("export failed")
+
+    for file_format in cst2csv.available_export_formats():
+        if file_format == "Touchstone":
+            continue
+        path = os.path.join(work_dir, 'existing' + cst2csv.EXPORT_FORMATS[file_format])
+        for callback in (lambda done, total: False, fail):
+            with open(path, 'wb') as f:
+                f.write(b'earlier export')
+            try:
+                completed = cst2csv.write_export(path, file_format, sweep, "Magnitude", progress_callback=callback)
+            except RuntimeError:
+                completed = False
+            if not completed:
+                with open(path, 'rb') as f:
+                    assert f.read() == b'earlier export', f"a stopped {file_format} export replaced an earlier file"
+            assert not glob.glob(path + '*.tmp'), f"a stopped {file_format} export left a temporary file"
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(), 'openpyxl.*'))) <= excel_temp_files, \
+        "a stopped Excel export left its worksheet files behind"
+
+def check_derived_cache_append(rng, work_dir):
+    # Views taken before append_runs keep their runs and cannot hand their smaller
+    # arrays to the grown sweep
+    sweep = random_sweep(rng, n_runs=3)
+    sweep.derived_cache = cst2csv.DerivedCache()
+    old_view = sweep.select_frequency_range(1.5, 3.5)
+    old_items = sweep.select_items(["S11"])
+    old_view.materialize("Magnitude (dB)")
+    new_runs = random_sweep(rng, n_runs=2)
+    new_runs.run_ids = np.array([4, 5])
+    sweep.append_runs(new_runs)
+    old_view.materialize("Magnitude (dB)")
+    view = sweep.select_frequency_range(1.5, 3.5)
+    np.testing.assert_allclose(view.derived('S11', 'db'), cst2csv.compute_value_column(view.s_params, 'db'))
+    np.testing.assert_allclose(old_view.derived('S11', 'db'),
+                               cst2csv.compute_value_column(old_view.s_params, 'db'))
+    assert view.derived('S11', 'db').shape == (5, view.n_freq)
+    for before in (old_view, old_items):
+        assert all(len(values) == before.n_runs == 3 for values in before.param_values.values()), \
+            "appending runs changed the parameters of an earlier view"
+    assert all(len(values) == view.n_runs for values in view.param_values.values())
+    assert old_view.select_runs(slice(0, 3)).derived('S11', 'db').shape == (3, old_view.n_freq)
+    np.testing.assert_allclose(view.select_runs(slice(3, 5)).derived('S11', 'db'),
+                               cst2csv.compute_value_column(view.s_params[3:5], 'db'))
+
+def check_result_cache_runs(rng, work_dir):
+    # A run-filtered load is never cached, and appended runs match a fresh load
+    os.environ.update({'FAKE_CST_RUNS': '8', 'FAKE_CST_POINTS': '21', 'FAKE_CST_PARAMS': '2'})
+    project = os.path.join(work_dir, 'cache_check.cst')
+    open(project, 'w').close()
+    cache = cst2csv.ResultCache(os.path.join(work_dir, 'cache'))
+    filtered = cst2csv.load_cst_runs(project, cache=cache, run_filter="p0 == 1")
+    assert 0 < filtered.n_runs < 8
+    assert cache.load(project, cst2csv.S11_RESULT_PATH) is None, "a run-filtered sweep was cached"
+
+    full = cst2csv.load_cst_runs(project, cache=cache)
+    assert full.n_runs == 8
+    os.environ['FAKE_CST_RUNS'] = '5'
+    grown = cst2csv.fetch_cst_runs(project)
+    os.environ['FAKE_CST_RUNS'] = '8'
+    grown.append_runs(cst2csv.fetch_new_runs(project, grown, [cst2csv.S11_RESULT_PATH]))
+    np.testing.assert_array_equal(grown.run_ids, full.run_ids)
+    np.testing.assert_array_equal(grown.s_params, full.s_params)
+
+    # A further item is read on the runs of the sweep when the cached one does not hold them
+    os.environ['FAKE_CST_PORTS'] = '2'
+    s21_path = cst2csv.sparameter_result_path('S21')
+    cst2csv.load_cst_runs(project, s21_path, cache=cache)
+    os.environ['FAKE_CST_RUNS'] = '10'
+    grown.append_runs(cst2csv.fetch_new_runs(project, grown, [cst2csv.S11_RESULT_PATH]))
+    for sweep in (filtered, grown):
+        item = cst2csv.load_sweep_item(project, s21_path, sweep, cache=cache)
+        np.testing.assert_array_equal(sweep.with_items(item).items['S21'],
+                                      cst2csv.fetch_cst_runs(project, s21_path, run_ids=sweep.run_ids.tolist()).s_params)
+
+CHECKS = [
+    check_resample_runs,
+    check_frequency_grids,
+    check_compute_summary,
+    check_csv_against_pandas,
+    check_touchstone_layout,
+    check_cancelled_exports,
+    check_derived_cache_append,
+    check_result_cache_runs,
+]
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as work_dir:
+            try:
+                check(rng, work_dir)
+            except Exception:
+                failed += 1
+                print(f"FAIL {check.__name__}")
+                traceback.print_exc()
+            else:
+                print(f"ok   {check.__name__}")
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} checks passed")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
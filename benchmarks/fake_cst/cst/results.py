@@ -0,0 +1,84 @@
+# Synthetic stand-in for CST's cst.results module, used by the benchmarks so the
+# pipeline can be measured without CST installed. Only the calls made by cst2csv are
+# implemented. The sweep is configured through environment variables:
+#
+#   FAKE_CST_RUNS       number of runs (default 100)
+#   FAKE_CST_POINTS     frequency points per run (default 1001)
+#   FAKE_CST_PARAMS     number of sweep parameters (default 3)
+#   FAKE_CST_PORTS      number of ports; items S1,1 .. SN,N exist (default 1)
+#   FAKE_CST_LATENCY    seconds slept in every get_result_item and
+#                       get_parameter_combination call (default 0)
+#   FAKE_CST_FREQ_START, FAKE_CST_FREQ_END  frequency axis in GHz (default 1 to 4)
+#   FAKE_CST_ADAPTIVE   1 gives every run its own frequency axis, as an adaptive
+#                       frequency sweep does: the end points plus a run-dependent
+#                       number (up to FAKE_CST_POINTS) of points between them
+import os
+import time
+import numpy as np
+
+SPARAMETER_FOLDER = '1D Results\\S-Parameters\\'
+
+def _setting(name, default, cast=int):
+    return cast(os.environ.get(name, default))
+
+class ResultItem:
+    def __init__(self, xdata, ydata):
+        self._xdata = xdata
+        self._ydata = ydata
+
+    def get_xdata(self):
+        return self._xdata
+
+    def get_ydata(self):
+        return self._ydata
+
+class ResultModule3D:
+    def __init__(self):
+        self.n_runs = _setting('FAKE_CST_RUNS', 100)
+        self.n_points = _setting('FAKE_CST_POINTS', 1001)
+        self.n_params = _setting('FAKE_CST_PARAMS', 3)
+        self.n_ports = _setting('FAKE_CST_PORTS', 1)
+        self.latency = _setting('FAKE_CST_LATENCY', 0.0, float)
+        self.adaptive = _setting('FAKE_CST_ADAPTIVE', 0)
+        self.frequencies = np.linspace(_setting('FAKE_CST_FREQ_START', 1.0, float),
+                                       _setting('FAKE_CST_FREQ_END', 4.0, float), self.n_points)
+
+    def get_tree_items(self, filter=''):
+        items = [f"{SPARAMETER_FOLDER}S{i},{j}"
+                 for i in range(1, self.n_ports + 1) for j in range(1, self.n_ports + 1)]
+        return ['1D Results\\Port signals\\i1'] + items
+
+    def get_run_ids(self, treepath):
+        return list(range(1, self.n_runs + 1))
+
+    def get_result_item(self, treepath, run_id):
+        if self.latency:
+            time.sleep(self.latency)
+        name = treepath[len(SPARAMETER_FOLDER):]
+        i, j = (int(port) for port in name[1:].split(','))
+        # A resonance whose frequency and depth depend on the run
+        rng = np.random.default_rng(run_id * 1000 + i * 100 + j)
+        f = self.frequencies
+        if self.adaptive:
+            axis_rng = np.random.default_rng(run_id)
+            inner = axis_rng.uniform(f[0], f[-1], axis_rng.integers(self.n_points // 2, self.n_points - 1))
+            f = np.concatenate([[f[0]], np.sort(inner), [f[-1]]])
+        f0 = f[0] + (f[-1] - f[0]) * (0.2 + 0.6 * rng.random())
+        q = 20 + 80 * rng.random()
+        depth = 0.8 + 0.19 * rng.random() if i == j else 0.3 * rng.random()
+        response = depth / (1 + 2j * q * (f - f0) / f0)
+        ydata = (1 - response) if i == j else response
+        # The real API returns Python lists
+        return ResultItem(f.tolist(), ydata.tolist())
+
+    def get_parameter_combination(self, run_id):
+        if self.latency:
+            time.sleep(self.latency)
+        return {f"p{k}": float(run_id % (k + 2)) + 0.5 * k for k in range(self.n_params)}
+
+class ProjectFile:
+    def __init__(self, filepath, allow_interactive=False):
+        self.filepath = filepath
+
+    def get_3d(self):
+        return ResultModule3D()
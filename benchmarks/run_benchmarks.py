@@ -0,0 +1,233 @@
+# Headless benchmarks of the cst2csv pipeline. CST is replaced by the synthetic
+# cst.results module in fake_cst/, so this runs on any machine with numpy and pandas.
+#
+#   python benchmarks/run_benchmarks.py --runs 200 --points 2001 --output new.json
+#   python benchmarks/run_benchmarks.py --runs 200 --points 2001 --compare old.json
+#
+# Every stage is timed --repeat times and the fastest run is reported. Results are
+# written as JSON together with the sweep size and library versions.
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, 'fake_cst'))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np
+import pandas as pd
+import cst2csv
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def populate_table(view, display_mode, rows):
+    # Model reset plus formatting of the first screenful of cells, as the view would
+    from PyQt5.QtWidgets import QApplication
+    from cst2csv_gui import ResultsTableModel
+
+    QApplication.instance() or QApplication([])
+    model = ResultsTableModel()
+    model.set_data(view, display_mode)
+    for row in range(min(rows, model.rowCount())):
+        for col in range(model.columnCount()):
+            model.data(model.index(row, col))
+    return model
+
+def output_bytes(path):
+    # Touchstone writes one <name>_run<ID>.sNp file per run next to path
+    if os.path.exists(path):
+        return os.path.getsize(path)
+    root = os.path.splitext(path)[0] + '_run'
+    directory = os.path.dirname(path)
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+               if os.path.join(directory, name).startswith(root))
+
+# Precision and compression settings the CSV export is additionally timed with
+CSV_DIGITS = {'frequency': 9, 'parameters': 6, 'values': 6}
+CSV_SETTINGS = [
+    ('digits', CSV_DIGITS, None),
+    ('gzip', None, 'gzip'),
+    ('digits_gzip', CSV_DIGITS, 'gzip'),
+    ('xz', None, 'xz'),
+    ('digits_xz', CSV_DIGITS, 'xz'),
+    ('zstd', None, 'zstd'),
+    ('digits_zstd', CSV_DIGITS, 'zstd'),
+]
+
+def run_benchmarks(args, work_dir):
+    os.environ.update({
+        'FAKE_CST_RUNS': str(args.runs),
+        'FAKE_CST_POINTS': str(args.points),
+        'FAKE_CST_PARAMS': str(args.params),
+        'FAKE_CST_PORTS': str(args.ports),
+        'FAKE_CST_LATENCY': str(args.latency),
+    })
+    project = os.path.join(work_dir, 'bench.cst')
+    open(project, 'w').close()
+    results = {}
+
+    def record(name, seconds, **extra):
+        results[name] = {'seconds': seconds, **extra}
+        details = ''.join(f", {key} {value}" for key, value in extra.items())
+        print(f"{name:<24} {seconds:10.4f} s{details}")
+
+    seconds, sweep = timed(lambda: cst2csv.fetch_cst_runs(project, max_workers=args.load_workers), args.repeat)
+    record('load', seconds)
+
+    cache = cst2csv.ResultCache(os.path.join(work_dir, 'cache'))
+    cache.store(project, cst2csv.S11_RESULT_PATH, sweep)
+    seconds, _ = timed(lambda: cache.load(project, cst2csv.S11_RESULT_PATH), args.repeat)
+    record('load_cached', seconds)
+
+    # Middle half of the frequency axis
+    freq_start = sweep.frequencies[len(sweep.frequencies) // 4]
+    freq_end = sweep.frequencies[3 * len(sweep.frequencies) // 4]
+    seconds, view = timed(lambda: sweep.select_frequency_range(freq_start, freq_end), args.repeat)
+    record('filter', seconds)
+
+    seconds, _ = timed(lambda: view.derived('S11', 'db'), args.repeat)
+    record('derived_db', seconds)
+
+    try:
+        seconds, _ = timed(lambda: populate_table(view, args.display_mode, args.table_rows), args.repeat)
+        record('table', seconds)
+    except ImportError:
+        print("table                    skipped (PyQt5 not installed)")
+
+    seconds, _ = timed(lambda: cst2csv.compute_summary(sweep.frequencies, sweep.s_params), args.repeat)
+    record('summary', seconds)
+
+    # The same sweep loaded into memory-mapped spill files (a memory budget of zero)
+    store = cst2csv.SpillStore(0, os.path.join(work_dir, 'spill'))
+    seconds, spilled = timed(lambda: cst2csv.fetch_cst_runs(project, max_workers=args.load_workers, store=store),
+                             args.repeat)
+    record('load_spilled', seconds)
+    seconds, _ = timed(lambda: cst2csv.compute_summary(spilled.frequencies, spilled.s_params), args.repeat)
+    record('summary_spilled', seconds)
+    spilled_view = spilled.select_frequency_range(freq_start, freq_end)
+    seconds, _ = timed(lambda: spilled_view.derived('S11', 'db'), args.repeat)
+    record('derived_db_spilled', seconds)
+
+    # Every run on its own frequency axis (an adaptive sweep), resampled onto the default
+    # evenly spaced grid and onto the axis of the first run
+    os.environ['FAKE_CST_ADAPTIVE'] = '1'
+    try:
+        seconds, _ = timed(lambda: cst2csv.fetch_cst_runs(project, max_workers=args.load_workers), args.repeat)
+        record('load_adaptive', seconds)
+        reference = ("Reference Run", None)
+        seconds, _ = timed(lambda: cst2csv.fetch_cst_runs(project, max_workers=args.load_workers,
+                                                          frequency_grid=reference), args.repeat)
+        record('load_adaptive_reference', seconds)
+    finally:
+        del os.environ['FAKE_CST_ADAPTIVE']
+
+    formats = args.formats or cst2csv.available_export_formats()
+    for file_format in formats:
+        path = os.path.join(work_dir, 'export' + cst2csv.EXPORT_FORMATS[file_format])
+        seconds, _ = timed(lambda: cst2csv.write_export(path, file_format, view, args.display_mode,
+                                                         layout=args.layout), args.repeat)
+        record(f"export_{file_format}", seconds, bytes=output_bytes(path))
+
+    # The tabular formats exported one after another, each computing its own values, and
+    # as an export queue sharing one materialized dataset
+    tabular = [fmt for fmt in formats if fmt in cst2csv.TABULAR_EXPORT_FORMATS]
+    if len(tabular) > 1:
+        def export_jobs(derived_cache):
+            shared = cst2csv.SweepData(view.frequencies, view.items, view.param_values, view.run_ids,
+                                       derived_cache, view.window)
+            return [{'path': os.path.join(work_dir, 'queue' + cst2csv.EXPORT_FORMATS[fmt]), 'file_format': fmt,
+                     'sweep': shared, 'display_mode': args.display_mode, 'layout': args.layout} for fmt in tabular]
+
+        def sequential():
+            for job in export_jobs(None):
+                cst2csv.run_export_job(job)
+
+        def queued():
+            with ThreadPoolExecutor(max_workers=cst2csv.DEFAULT_EXPORT_QUEUE_WORKERS) as pool:
+                list(pool.map(cst2csv.run_export_job, export_jobs(cst2csv.DerivedCache())))
+
+        seconds, _ = timed(sequential, args.repeat)
+        record('export_sequential', seconds, formats='+'.join(tabular))
+        seconds, _ = timed(queued, args.repeat)
+        record('export_queue', seconds, formats='+'.join(tabular))
+
+    if "CSV" in formats:
+        # Size/time trade-off of the text export settings
+        for name, precision, compression in CSV_SETTINGS:
+            if compression and compression not in cst2csv.available_compressions():
+                print(f"export_CSV_{name:<13} skipped ({compression} not available)")
+                continue
+            path = cst2csv.compressed_path(os.path.join(work_dir, f"export_{name}.csv"), compression)
+            seconds, _ = timed(lambda: cst2csv.write_export(path, "CSV", view, args.display_mode, layout=args.layout,
+                                                             precision=precision, compression=compression),
+                               args.repeat)
+            record(f"export_CSV_{name}", seconds, bytes=output_bytes(path))
+
+    return results
+
+def compare(old, new):
+    print(f"\n{'stage':<24} {'old (s)':>10} {'new (s)':>10} {'speedup':>8}")
+    for name, result in new.items():
+        if name in old:
+            speedup = old[name]['seconds'] / result['seconds'] if result['seconds'] else float('inf')
+            print(f"{name:<24} {old[name]['seconds']:10.4f} {result['seconds']:10.4f} {speedup:7.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cst2csv against a synthetic CST project.")
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--points', type=int, default=1001)
+    parser.add_argument('--params', type=int, default=3)
+    parser.add_argument('--ports', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="seconds of simulated latency per cst.results call")
+    parser.add_argument('--load-workers', type=int, default=cst2csv.DEFAULT_LOAD_WORKERS)
+    parser.add_argument('--display-mode', choices=list(cst2csv.VALUE_COLUMNS),
+                        default="Complex (Real + Imaginary)")
+    parser.add_argument('--formats', nargs='*', choices=list(cst2csv.EXPORT_FORMATS),
+                        help="export formats to time (default: all available)")
+    parser.add_argument('--layout', choices=list(cst2csv.EXPORT_LAYOUTS), default="Long",
+                        help="layout of the tabular exports")
+    parser.add_argument('--table-rows', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(args, work_dir)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sweep': {'runs': args.runs, 'points': args.points, 'params': args.params,
+                  'ports': args.ports, 'latency': args.latency},
+        'display_mode': args.display_mode,
+        'layout': args.layout,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f)['results'], results)
+
+if __name__ == '__main__':
+    main()
@@ -1,75 +1,1879 @@
+import time
+STARTUP_START = time.perf_counter()  # reference for the time-to-first-window measurement
 import sys
-import math
-import pandas as pd
-import numpy as np
 import json
 import os
-from PyQt5 import QtWidgets, QtGui
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, 
-                           QTableWidget, QTableWidgetItem, QVBoxLayout, QCheckBox, QLineEdit, 
-                           QWidget, QSpinBox, QScrollArea, QGroupBox, QHBoxLayout, QDoubleSpinBox,
-                           QComboBox, QTabWidget, QTextEdit, QDialog)
-from PyQt5.QtCore import Qt
+import glob
+import argparse
+import threading
+import hashlib
+import re
+import importlib.util
+import zipfile
+import gzip
+import lzma
+import io
+import mmap
+import tempfile
+import weakref
+import logging
+import logging.handlers
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import numpy as np
+# pandas, pyarrow, openpyxl and h5py are imported where they are used, keeping them off
+# the startup path
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
 
-class LibraryPathDialog(QDialog):
-    def __init__(self, parent=None, current_path=None):
-        super().__init__(parent)
-        self.setWindowTitle("CST Library Path Configuration")
-        self.setModal(True)
-        
-        layout = QVBoxLayout(self)
-        
-        # Path input
-        path_group = QGroupBox("CST Python Library Path")
-        path_layout = QHBoxLayout()
-        
-        self.path_input = QLineEdit(current_path if current_path else "")
-        self.browse_btn = QPushButton("Browse")
-        self.browse_btn.clicked.connect(self.browse_path)
-        
-        path_layout.addWidget(self.path_input)
-        path_layout.addWidget(self.browse_btn)
-        path_group.setLayout(path_layout)
-        layout.addWidget(path_group)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        self.save_btn = QPushButton("Save")
-        self.save_btn.clicked.connect(self.accept)
-        self.cancel_btn = QPushButton("Cancel")
-        self.cancel_btn.clicked.connect(self.reject)
-        
-        button_layout.addWidget(self.save_btn)
-        button_layout.addWidget(self.cancel_btn)
-        layout.addLayout(button_layout)
-        
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 5px 15px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QLineEdit {
-                padding: 5px;
-                border: 1px solid #ddd;
-                border-radius: 3px;
-            }
-        """)
-    
-    def browse_path(self):
-        path = QFileDialog.getExistingDirectory(self, "Select CST Python Libraries Directory")
-        if path:
-            self.path_input.setText(path)
-    
-    def get_path(self):
-        return self.path_input.text()
+SPARAMETER_FOLDER = '1D Results\\S-Parameters\\'
+S11_RESULT_PATH = SPARAMETER_FOLDER + 'S1,1'
+DEFAULT_LOAD_WORKERS = 4
+DEFAULT_WATCH_INTERVAL_S = 30
+DEFAULT_EXPORT_QUEUE_WORKERS = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+DEFAULT_CACHE_MAX_MB = 2048
+DEFAULT_DERIVED_CACHE_MB = 512
+DEFAULT_MEMORY_BUDGET_MB = 8192
+DEFAULT_PERF_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_log.jsonl')
+
+FREQUENCY_COLUMN = "Frequency (GHz)"
+PROJECT_COLUMN = "Project"
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+def current_rss_bytes():
+    # Current resident set size of this process, or None where it cannot be read
+    if sys.platform == 'win32':
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class PerfSpan:
+    # Times a stage and samples the resident set size around it. The growth is that of
+    # the whole process, so spans running concurrently on other threads add to it.
+    def __init__(self, recorder, stage):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self):
+        self.start_rss = current_rss_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        end_rss = current_rss_bytes()
+        growth = max(0, end_rss - self.start_rss) if end_rss is not None and self.start_rss is not None else None
+        self.recorder.record(self.stage, duration, growth)
+
+class PerfRecorder:
+    # Timing and memory spans around the hot paths. While disabled, span() hands out a
+    # shared no-op context manager so instrumented code pays next to nothing. When
+    # enabled, per-stage statistics are kept in memory and every span is appended to a
+    # rotating JSON-lines log.
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('cst2csv.perf')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.noop = nullcontext()
+
+    def configure(self, enabled, log_path=DEFAULT_PERF_LOG, max_bytes=1024 * 1024, backup_count=3):
+        self.enabled = enabled
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        if enabled and log_path:
+            try:
+                self.logger.addHandler(logging.handlers.RotatingFileHandler(
+                    log_path, maxBytes=max_bytes, backupCount=backup_count))
+            except OSError:
+                pass
+
+    def configure_from_config(self, config):
+        self.configure(bool(config.get('perf_enabled', False)), config.get('perf_log') or DEFAULT_PERF_LOG)
+
+    def span(self, stage):
+        if not self.enabled:
+            return self.noop
+        return PerfSpan(self, stage)
+
+    def record(self, stage, duration, rss_growth=None):
+        # rss_growth: bytes the resident set grew by during the span, if it was sampled
+        with self.lock:
+            stat = self.stats.setdefault(stage, {'count': 0, 'total': 0.0, 'max': 0.0, 'rss_growth': None})
+            stat['count'] += 1
+            stat['total'] += duration
+            stat['max'] = max(stat['max'], duration)
+            if rss_growth is not None:
+                stat['rss_growth'] = max(stat['rss_growth'] or 0, rss_growth)
+        if self.logger.handlers:
+            self.logger.info(json.dumps({'time': time.time(), 'stage': stage,
+                                         'duration': duration, 'rss_growth': rss_growth}))
+
+    def snapshot(self):
+        with self.lock:
+            return {stage: dict(stat) for stage, stat in self.stats.items()}
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+perf_recorder = PerfRecorder()
+
+# Value columns shown for each display mode, as (column suffix, quantity)
+VALUE_COLUMNS = {
+    "Complex (Real + Imaginary)": [("Real", 'real'), ("Imaginary", 'imag')],
+    "Magnitude": [("Magnitude", 'mag')],
+    "Magnitude (dB)": [("(dB)", 'db')],
+    "Magnitude and Phase": [("Magnitude", 'mag'), ("Phase (degrees)", 'phase')],
+}
+
+def value_columns(display_mode, labels=("S11",)):
+    # [(column name, S-parameter label, quantity)] for every loaded S-parameter item
+    suffixes = VALUE_COLUMNS.get(display_mode, VALUE_COLUMNS["Magnitude and Phase"])
+    return [(f"{label} {suffix}", label, quantity) for label in labels for suffix, quantity in suffixes]
+
+def compute_value_column(s_params, quantity):
+    # s_params is a complex array of any shape; the result has the same shape
+    if quantity == 'real':
+        return np.real(s_params)
+    if quantity == 'imag':
+        return np.imag(s_params)
+    if quantity == 'mag':
+        return np.abs(s_params)
+    if quantity == 'db':
+        with np.errstate(divide='ignore'):
+            return 20 * np.log10(np.abs(s_params))
+    if quantity == 'phase':
+        return np.degrees(np.angle(s_params))
+    raise KeyError(quantity)
+
+def sparameter_label(result_path):
+    # '1D Results\S-Parameters\S2,1' -> 'S21'; the comma is kept once a port number
+    # has two digits ('S1,12') so labels stay unambiguous
+    name = result_path.rsplit('\\', 1)[-1]
+    match = re.match(r'S(\d+),(\d+)$', name)
+    if match and len(match.group(1)) == 1 and len(match.group(2)) == 1:
+        return f"S{match.group(1)}{match.group(2)}"
+    return name
+
+def sparameter_result_path(name):
+    # Accepts a full result path, 'S2,1' or 'S21'
+    if '\\' in name:
+        return name
+    match = re.match(r'S(\d)(\d)$', name)
+    if match:
+        name = f"S{match.group(1)},{match.group(2)}"
+    return SPARAMETER_FOLDER + name
+
+def parameter_table(parameters):
+    # List of per-run parameter dicts -> {name: array of values}
+    if not parameters or not parameters[0]:
+        return {}
+    return {name: np.array([run_params[name] for run_params in parameters])
+            for name in parameters[0].keys()}
+
+def append_rows(buffer, n_rows, new_rows, allocate=np.empty):
+    # buffer holds n_rows valid rows; new_rows are written into its spare capacity, which
+    # is doubled when it runs out, so appends cost time in the number of new rows
+    total = n_rows + len(new_rows)
+    dtype = np.result_type(buffer, new_rows)
+    if buffer.shape[0] < total or dtype != buffer.dtype:
+        grown = allocate((max(total, 2 * n_rows),) + buffer.shape[1:], dtype)
+        grown[:n_rows] = buffer[:n_rows]
+        buffer = grown
+    buffer[n_rows:total] = new_rows
+    return buffer
+
+def run_filter_mask(param_values, run_filter):
+    # Boolean mask of the runs whose sweep parameters satisfy run_filter, a pandas query
+    # expression such as 'L in [10, 12] and W == 3' or '10 <= L <= 12'
+    import pandas as pd
+
+    n_runs = len(next(iter(param_values.values()))) if param_values else 0
+    try:
+        mask = np.asarray(pd.DataFrame(param_values).eval(run_filter))
+    except Exception as e:
+        raise ValueError(f"Invalid run filter '{run_filter}': {str(e)}")
+    if mask.dtype != bool or mask.shape != (n_runs,):
+        raise ValueError(f"Run filter '{run_filter}' is not a condition on the sweep parameters")
+    return mask
+
+class DerivedCache:
+    # LRU cache of derived arrays (real/imaginary, magnitude, dB, phase) keyed by item,
+    # quantity, frequency window and number of runs, bounded by a memory budget. Thread-safe; concurrent
+    # export jobs that need the same array wait for a single computation of it.
+    def __init__(self, max_bytes=DEFAULT_DERIVED_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> Event of a computation in progress
+        self.buffers = {}  # key -> append_rows storage an entry is the first rows of
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(int(config.get('derived_cache_mb', DEFAULT_DERIVED_CACHE_MB)) * 1024 * 1024)
+
+    def get(self, key):
+        with self.lock:
+            values = self.entries.get(key)
+            if values is not None:
+                self.entries.move_to_end(key)
+            return values
+
+    def put(self, key, values):
+        with self.lock:
+            if values.nbytes > self.max_bytes or key in self.entries:
+                return
+            self.entries[key] = values
+            self.nbytes += values.nbytes
+            while self.nbytes > self.max_bytes:
+                evicted_key, evicted = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.buffers.pop(evicted_key, None)
+
+    def get_or_compute(self, key, compute):
+        # get, or compute() and put. While one thread computes a key, others asking for
+        # it wait and then take the cached result (or compute it themselves if it was
+        # too large to keep).
+        while True:
+            with self.lock:
+                values = self.entries.get(key)
+                if values is not None:
+                    self.entries.move_to_end(key)
+                    return values
+                event = self.pending.get(key)
+                if event is None:
+                    event = self.pending[key] = threading.Event()
+                    break
+            event.wait()
+        try:
+            values = compute()
+            self.put(key, values)
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+        return values
+
+    def append_runs(self, n_runs, compute_rows):
+        # Carries the arrays of a sweep of n_runs runs over to the sweep grown by
+        # append_runs: the values of the new runs (compute_rows(label, quantity, window))
+        # are written into spare rows as append_rows does, so views of the previous runs
+        # keep their arrays and a refresh costs time in the number of new runs. Real and
+        # imaginary parts (views of the S-parameters) and memory-mapped arrays are left to
+        # be computed again. Entries of the previous runs are dropped.
+        with self.lock:
+            entries = [(key, values) for key, values in self.entries.items() if key[3] == n_runs]
+            for key, values in entries:
+                del self.entries[key]
+                self.nbytes -= values.nbytes
+        for key, values in entries:
+            label, quantity, window, _ = key
+            if quantity in ('real', 'imag') or is_spilled(values):
+                continue
+            new_rows = compute_rows(label, quantity, window)
+            with self.lock:
+                buffer = self.buffers.pop(key, values)
+            total = n_runs + len(new_rows)
+            buffer = append_rows(buffer, n_runs, new_rows)
+            grown_key = (label, quantity, window, total)
+            self.put(grown_key, buffer[:total])
+            with self.lock:
+                if grown_key in self.entries:
+                    self.buffers[grown_key] = buffer
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.buffers.clear()
+            self.nbytes = 0
+
+# Element types the S-parameter matrices can be stored with
+SPILL_DTYPES = {
+    "complex128": np.complex128,
+    "complex64": np.complex64,
+}
+SPILL_BLOCK_BYTES = 64 * 1024 * 1024
+TABLE_BLOCK_BYTES = 4 * 1024 * 1024  # S-parameters per item the results table derives at a time
+SPILL_FILE_PREFIX = 'cst2csv_'
+
+def is_spilled(array):
+    # True if array is (a view of) a memory-mapped file
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+def block_rows(array, block_bytes=SPILL_BLOCK_BYTES):
+    # Rows of array that fit in block_bytes, at least one
+    row_bytes = array.itemsize * int(np.prod(array.shape[1:], dtype=np.int64))
+    return max(1, block_bytes // max(1, row_bytes))
+
+def remove_spill_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class SpillStore:
+    # Allocates the runs x frequencies matrices of loaded sweeps with a memory budget.
+    # Matrices are held in RAM while the ones alive fit in memory_budget bytes; beyond it
+    # they become np.memmap arrays in temporary files under spill_dir, which the OS pages
+    # in only where they are read. dtype (complex128 or complex64) is the element type
+    # S-parameters are stored with. Thread-safe, so concurrent loads can share a store.
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET_MB * 1024 * 1024, spill_dir=None, dtype=np.complex128):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir or tempfile.gettempdir()
+        self.dtype = np.dtype(dtype)
+        self.in_memory = 0
+        self.spilled = 0
+        self.lock = threading.Lock()
+        if os.name == 'nt':
+            self.remove_stale_files()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(int(config.get('memory_budget_mb', DEFAULT_MEMORY_BUDGET_MB)) * 1024 * 1024,
+                   config.get('spill_dir'), SPILL_DTYPES[config.get('spill_dtype', "complex128")])
+
+    def allocate(self, shape, dtype=None):
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        with self.lock:
+            in_memory = nbytes == 0 or self.in_memory + nbytes <= self.memory_budget
+            if in_memory:
+                self.in_memory += nbytes
+            else:
+                self.spilled += nbytes
+        if in_memory:
+            array = np.empty(shape, dtype)
+            weakref.finalize(array, self.release, nbytes, False)
+            return array
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=SPILL_FILE_PREFIX, suffix='.spill', dir=self.spill_dir)
+        os.close(fd)
+        array = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+        weakref.finalize(array, self.release, nbytes, True)
+        if os.name == 'nt':
+            # A mapped file cannot be deleted on Windows; whatever is left behind is
+            # removed by the next store
+            weakref.finalize(array, remove_spill_file, path)
+        else:
+            remove_spill_file(path)  # the mapping keeps the data until it is closed
+        return array
+
+    def release(self, nbytes, spilled):
+        with self.lock:
+            if spilled:
+                self.spilled -= nbytes
+            else:
+                self.in_memory -= nbytes
+
+    def remove_stale_files(self):
+        if os.path.isdir(self.spill_dir):
+            for name in os.listdir(self.spill_dir):
+                if name.startswith(SPILL_FILE_PREFIX) and name.endswith('.spill'):
+                    remove_spill_file(os.path.join(self.spill_dir, name))
+
+    def take(self, array, indices):
+        # array[indices] for a fancy index, copied into a store array block by block
+        out = self.allocate((len(indices),) + array.shape[1:], array.dtype)
+        step = block_rows(out)
+        for start in range(0, len(indices), step):
+            out[start:start + step] = array[indices[start:start + step]]
+        return out
+
+    def derive(self, s_params, quantity):
+        # compute_value_column into a store array, block by block, so that a spilled
+        # matrix is never paged in whole
+        dtype = compute_value_column(s_params[:0], quantity).dtype
+        out = self.allocate(s_params.shape, dtype)
+        step = block_rows(s_params)
+        for start in range(0, len(s_params), step):
+            out[start:start + step] = compute_value_column(s_params[start:start + step], quantity)
+        return out
+
+    def read_npy(self, fp):
+        # A 2-D .npy stream (e.g. a member of an uncompressed .npz) read into a store
+        # array with the store's dtype, block by block
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+        else:
+            raise ValueError(f"Unsupported .npy version {version}")
+        if fortran_order or len(shape) != 2 or dtype.hasobject:
+            raise ValueError("Only C-ordered runs x frequencies matrices can be read into the store")
+        out = self.allocate(shape, self.dtype if dtype.kind == 'c' else dtype)
+        step = block_rows(out)
+        for start in range(0, shape[0], step):
+            rows = min(step, shape[0] - start)
+            data = fp.read(rows * shape[1] * dtype.itemsize)
+            out[start:start + rows] = np.frombuffer(data, dtype).reshape(rows, shape[1])
+        return out
+
+class SweepData:
+    # One contiguous runs x frequencies complex array per S-parameter item (keyed by
+    # label, e.g. 'S11'), the frequency axis and a columnar parameter table (one array
+    # per sweep parameter). Frequency, run and item selections return SweepData views
+    # that share memory with the original. Views remember their frequency window and run
+    # window within the loaded sweep (and the run count of that sweep, which grows with
+    # append_runs) so that derived quantities can be memoized in a DerivedCache shared by
+    # all views. Matrices allocated by a SpillStore may be
+    # memory-mapped; derived values, run selections and appends of those go through the
+    # store too.
+    def __init__(self, frequencies, items, param_values=None, run_ids=None,
+                 derived_cache=None, window=None, run_window=None, store=None):
+        self.frequencies = np.asarray(frequencies)
+        self.items = {label: np.asarray(s_params) for label, s_params in items.items()}
+        self.param_values = param_values if param_values is not None else {}
+        if run_ids is None:
+            run_ids = np.arange(1, self.s_params.shape[0] + 1) if self.items else np.empty(0, dtype=int)
+        self.run_ids = np.asarray(run_ids)
+        self.derived_cache = derived_cache
+        self.window = window if window is not None else (0, len(self.frequencies))
+        self.run_window = run_window  # None: all runs
+        self.sweep_runs = self.n_runs  # runs of the sweep a run window was taken from
+        self.buffers = {}  # append_runs storage with spare rows, keyed like items
+        self.store = store
+
+    def view(self, frequencies, items, param_values, run_ids, window, run_window):
+        sweep = SweepData(frequencies, items, param_values, run_ids, self.derived_cache, window, run_window,
+                          self.store)
+        if run_window is not None:
+            sweep.sweep_runs = self.sweep_runs if self.run_window is not None else self.n_runs
+        return sweep
+
+    def compute(self, label, quantity):
+        s_params = self.items[label]
+        if self.store is not None and is_spilled(s_params):
+            return self.store.derive(s_params, quantity)
+        return compute_value_column(s_params, quantity)
+
+    def derived(self, label, quantity):
+        # compute_value_column of an item, memoized per frequency window. Run blocks (e.g.
+        # export chunks) are sliced from a cached whole-run array when there is one and
+        # are never stored themselves.
+        if self.derived_cache is None:
+            return self.compute(label, quantity)
+        key = (label, quantity, self.window, self.n_runs if self.run_window is None else self.sweep_runs)
+        if self.run_window is not None:
+            values = self.derived_cache.get(key)
+            if values is not None:
+                return values[self.run_window[0]:self.run_window[1]]
+            return self.compute(label, quantity)
+        return self.derived_cache.get_or_compute(key, lambda: self.compute(label, quantity))
+
+    def materialize(self, display_mode, selected_columns=None):
+        # Computes the derived values an export of display_mode needs into the
+        # DerivedCache, once for every export of this view, so that the export's blocks
+        # of runs are sliced from them. Values too large for the cache are left to be
+        # computed block by block.
+        if self.derived_cache is None or self.run_window is not None:
+            return
+        for name, label, quantity in value_columns(display_mode, self.labels):
+            if selected_columns is not None and name not in selected_columns:
+                continue
+            s_params = self.items[label]
+            if s_params.size * s_params.real.itemsize <= self.derived_cache.max_bytes:
+                self.derived(label, quantity)
+
+    @property
+    def labels(self):
+        return list(self.items)
+
+    @property
+    def s_params(self):
+        # The first item; used where a single quantity is summarized
+        return next(iter(self.items.values()))
+
+    @property
+    def n_runs(self):
+        return len(self.run_ids)
+
+    @property
+    def n_freq(self):
+        return len(self.frequencies)
+
+    @property
+    def param_names(self):
+        return list(self.param_values)
+
+    def run_parameters(self, run_idx):
+        return {name: values[run_idx].item() for name, values in self.param_values.items()}
+
+    def frequency_slice(self, freq_start=None, freq_end=None):
+        # Index bounds of [freq_start, freq_end] on the sorted frequency axis
+        start = 0 if freq_start is None else int(np.searchsorted(self.frequencies, freq_start, side='left'))
+        stop = self.n_freq if freq_end is None else int(np.searchsorted(self.frequencies, freq_end, side='right'))
+        return slice(start, max(start, stop))
+
+    def select_frequency_range(self, freq_start=None, freq_end=None):
+        # None leaves that side of the range open
+        freq_slice = self.frequency_slice(freq_start, freq_end)
+        window = (self.window[0] + freq_slice.start, self.window[0] + freq_slice.stop)
+        return self.view(self.frequencies[freq_slice],
+                         {label: s_params[:, freq_slice] for label, s_params in self.items.items()},
+                         self.param_values, self.run_ids, window, self.run_window)
+
+    def select_runs(self, run_slice):
+        start, stop, _ = run_slice.indices(self.n_runs)
+        offset = self.run_window[0] if self.run_window is not None else 0
+        return self.view(self.frequencies,
+                         {label: s_params[run_slice] for label, s_params in self.items.items()},
+                         {name: values[run_slice] for name, values in self.param_values.items()},
+                         self.run_ids[run_slice], self.window, (offset + start, offset + max(start, stop)))
+
+    def take_runs(self, indices):
+        # The runs at indices (e.g. np.flatnonzero of a run_filter_mask), copied into a
+        # new sweep; unlike select_runs this is not a view
+        take = self.store.take if self.store is not None else lambda s_params, indices: s_params[indices]
+        return SweepData(self.frequencies, {label: take(s_params, indices) for label, s_params in self.items.items()},
+                         {name: values[indices] for name, values in self.param_values.items()},
+                         self.run_ids[indices], store=self.store)
+
+    def select_items(self, labels):
+        return self.view(self.frequencies, {label: self.items[label] for label in labels},
+                         self.param_values, self.run_ids, self.window, self.run_window)
+
+    def with_items(self, other):
+        # Adds the items of another load of the same sweep
+        if not np.array_equal(self.run_ids, other.run_ids) or not np.array_equal(self.frequencies, other.frequencies):
+            raise ValueError(f"{', '.join(other.labels)} does not share the runs and frequency axis "
+                             f"of {', '.join(self.labels)}")
+        return self.view(self.frequencies, {**self.items, **other.items}, self.param_values, self.run_ids,
+                         self.window, self.run_window)
+
+    def append_runs(self, other):
+        # Appends the runs of a later load of the same items in place. Earlier views keep
+        # the runs they were taken with, since rows are only ever written past their end.
+        # Derived values cached for the previous runs are extended with the new runs.
+        if self.run_window is not None or self.window != (0, self.n_freq):
+            raise ValueError("Runs can only be appended to a complete sweep")
+        if set(other.labels) != set(self.labels) or not np.array_equal(self.frequencies, other.frequencies):
+            raise ValueError("New runs do not share the items and frequency axis of the loaded sweep")
+        if set(other.param_names) != set(self.param_names):
+            raise ValueError("New runs do not share the sweep parameters of the loaded sweep")
+        n_runs, total = self.n_runs, self.n_runs + other.n_runs
+        allocate = self.store.allocate if self.store is not None else np.empty
+        for label in self.labels:
+            buffer = append_rows(self.buffers.get(label, self.items[label]), n_runs, other.items[label], allocate)
+            self.buffers[label] = buffer
+            self.items[label] = buffer[:total]
+        # Views share the parameter dict (items are a dict per view), so it is replaced
+        # rather than updated
+        self.param_values = dict(self.param_values)
+        for name in self.param_names:
+            key = ('param', name)
+            buffer = append_rows(self.buffers.get(key, self.param_values[name]), n_runs, other.param_values[name])
+            self.buffers[key] = buffer
+            self.param_values[name] = buffer[:total]
+        buffer = append_rows(self.buffers.get('run_ids', self.run_ids), n_runs, other.run_ids)
+        self.buffers['run_ids'] = buffer
+        self.run_ids = buffer[:total]
+        if self.derived_cache is not None:
+            self.derived_cache.append_runs(n_runs, lambda label, quantity, window: compute_value_column(
+                other.items[label][:, window[0]:window[1]], quantity))
+
+def build_export_columns(sweep, display_mode, selected_columns=None):
+    # Returns an ordered {column: array} mapping in long format (one row per run and
+    # frequency). Columns that are not selected are never computed.
+    values = {name: (label, quantity) for name, label, quantity in value_columns(display_mode, sweep.labels)}
+    all_columns = [FREQUENCY_COLUMN] + sweep.param_names + list(values)
+    if selected_columns is None:
+        selected_columns = all_columns
+
+    columns = {}
+    for col in selected_columns:
+        if col not in all_columns or col in columns:
+            continue
+        if col == FREQUENCY_COLUMN:
+            columns[col] = np.tile(sweep.frequencies, sweep.n_runs)
+        elif col in sweep.param_values:
+            columns[col] = np.repeat(sweep.param_values[col], sweep.n_freq)
+        else:
+            label, quantity = values[col]
+            columns[col] = sweep.derived(label, quantity).ravel()
+    return columns
+
+EXPORT_CHUNK_ROWS = 200000
+
+class ProjectSweeps:
+    # Several loaded projects exported as one long-format table with a Project column.
+    # Every project keeps its own SweepData, frequency axis and sweep parameters; the
+    # union of their columns is reconciled block by block while exporting (columns a
+    # project lacks are left empty), so no project's data is copied up front.
+    def __init__(self, projects):
+        self.projects = OrderedDict(projects)
+
+    @property
+    def n_runs(self):
+        return sum(sweep.n_runs for sweep in self.projects.values())
+
+    @property
+    def labels(self):
+        return list(OrderedDict.fromkeys(label for sweep in self.projects.values() for label in sweep.labels))
+
+    @property
+    def param_names(self):
+        return list(OrderedDict.fromkeys(name for sweep in self.projects.values() for name in sweep.param_names))
+
+    def select_frequency_range(self, freq_start=None, freq_end=None):
+        return ProjectSweeps((name, sweep.select_frequency_range(freq_start, freq_end))
+                             for name, sweep in self.projects.items())
+
+    def materialize(self, display_mode, selected_columns=None):
+        for sweep in self.projects.values():
+            sweep.materialize(display_mode, selected_columns)
+
+    def column_names(self, display_mode, selected_columns=None):
+        all_columns = ([PROJECT_COLUMN, FREQUENCY_COLUMN] + self.param_names +
+                       [name for name, _, _ in value_columns(display_mode, self.labels)])
+        if selected_columns is None:
+            return all_columns
+        return [col for col in all_columns if col in selected_columns]
+
+    def param_dtype(self, name):
+        # One dtype per parameter column across projects, so every block of a Parquet or
+        # Feather file has the same schema. Non-numeric parameters are written as text.
+        arrays = [sweep.param_values[name] for sweep in self.projects.values() if name in sweep.param_values]
+        if any(values.dtype.kind not in 'biuf' for values in arrays):
+            return np.dtype(str)
+        if len(arrays) < len(self.projects):
+            arrays.append(np.array([np.nan]))
+        return np.result_type(*arrays)
+
+    def iter_export_chunks(self, display_mode, selected_columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        names = self.column_names(display_mode, selected_columns)
+        dtypes = {name: self.param_dtype(name) for name in self.param_names if name in names}
+        runs_done, total_runs = 0, self.n_runs
+        for project, sweep in self.projects.items():
+            chunk_start = 0
+            for project_runs, _, columns in iter_export_chunks(sweep, display_mode, names, chunk_rows):
+                rows = (project_runs - chunk_start) * sweep.n_freq
+                chunk_start = project_runs
+                merged = {}
+                for name in names:
+                    if name == PROJECT_COLUMN:
+                        merged[name] = np.full(rows, project, dtype=object)
+                    elif name in columns:
+                        merged[name] = columns[name].astype(dtypes[name], copy=False) if name in dtypes else columns[name]
+                    elif name in dtypes and dtypes[name].kind == 'U':
+                        merged[name] = np.full(rows, '')
+                    else:
+                        merged[name] = np.full(rows, np.nan, dtype=dtypes.get(name, float))
+                yield runs_done + project_runs, total_runs, merged
+            runs_done += sweep.n_runs
+
+def project_names(project_paths):
+    # File stems, made unique with a counter, used as the values of the Project column
+    names = []
+    for path in project_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, count = stem, 1
+        while name in names:
+            count += 1
+            name = f"{stem} ({count})"
+        names.append(name)
+    return names
+
+
+# Export format name -> file extension
+EXPORT_FORMATS = {
+    "CSV": ".csv",
+    "Excel": ".xlsx",
+    "Parquet": ".parquet",
+    "Feather": ".feather",
+    "HDF5": ".h5",
+    "NumPy (NPZ)": ".npz",
+    "Touchstone": ".snp",
+    "Touchstone (ZIP)": ".zip",
+}
+
+EXPORT_FILE_FILTERS = {
+    "CSV": "CSV Files (*.csv)",
+    "Excel": "Excel Files (*.xlsx)",
+    "Parquet": "Parquet Files (*.parquet)",
+    "Feather": "Feather Files (*.feather)",
+    "HDF5": "HDF5 Files (*.h5)",
+    "NumPy (NPZ)": "NumPy Archives (*.npz)",
+    "Touchstone": "Touchstone Files, one per run (*.snp)",
+    "Touchstone (ZIP)": "ZIP Archives (*.zip)",
+}
+
+# Optional packages the export formats depend on
+EXPORT_FORMAT_MODULES = {
+    "Excel": "openpyxl",
+    "Parquet": "pyarrow",
+    "Feather": "pyarrow",
+    "HDF5": "h5py",
+}
+
+def available_export_formats():
+    return [fmt for fmt in EXPORT_FORMATS
+            if fmt not in EXPORT_FORMAT_MODULES or importlib.util.find_spec(EXPORT_FORMAT_MODULES[fmt])]
+
+# Formats written from the derived value columns; the others store complex S-parameters
+TABULAR_EXPORT_FORMATS = ("CSV", "Excel", "Parquet", "Feather")
+
+# Tabular export layouts: "Long" has one row per run and frequency, "Wide" one row per
+# frequency and one column per run (parameters go to a sidecar table)
+EXPORT_LAYOUTS = ("Long", "Wide")
+RUN_ID_COLUMN = "Run ID"
+
+def wide_value_columns(sweep, display_mode, selected_columns=None):
+    return [(name, label, quantity) for name, label, quantity in value_columns(display_mode, sweep.labels)
+            if selected_columns is None or name in selected_columns]
+
+def wide_column_names(sweep, display_mode, selected_columns=None):
+    # The frequency, then every selected value column once per run: 'S11 (dB) [Run 3]'
+    return [FREQUENCY_COLUMN] + [f"{name} [Run {run_id}]"
+                                 for name, _, _ in wide_value_columns(sweep, display_mode, selected_columns)
+                                 for run_id in sweep.run_ids]
+
+def iter_wide_chunks(sweep, display_mode, selected_columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Yields (points_done, total_points, columns) for blocks of frequency points of the
+    # wide layout. Each block is filled from the derived runs x frequencies arrays as
+    # one 2D array of their dtype, and its columns are handed out as views.
+    names = wide_column_names(sweep, display_mode, selected_columns)
+    derived = [sweep.derived(label, quantity)
+               for _, label, quantity in wide_value_columns(sweep, display_mode, selected_columns)]
+    dtype = np.result_type(*derived) if derived else float
+    points_per_chunk = max(1, chunk_rows // max(1, sweep.n_runs))
+    for start in range(0, sweep.n_freq, points_per_chunk):
+        stop = min(start + points_per_chunk, sweep.n_freq)
+        with perf_recorder.span('export_build'):
+            block = np.empty((stop - start, len(names) - 1), dtype)
+            for k, values in enumerate(derived):
+                block[:, k * sweep.n_runs:(k + 1) * sweep.n_runs] = values[:, start:stop].T
+            columns = {names[0]: sweep.frequencies[start:stop]}
+            columns.update((name, block[:, i]) for i, name in enumerate(names[1:]))
+        yield stop, sweep.n_freq, columns
+
+def parameter_columns(sweep):
+    return {RUN_ID_COLUMN: sweep.run_ids, **sweep.param_values}
+
+def parameter_sidecar_path(path):
+    # export.csv -> export_parameters.csv, export.csv.gz -> export_parameters.csv.gz
+    compressed = next((ext for ext in COMPRESSIONS.values() if path.endswith(ext)), '')
+    root, ext = os.path.splitext(path[:len(path) - len(compressed)])
+    return root + '_parameters' + ext + compressed
+
+def write_parameter_sidecar(path, file_format, sweep, precision=None):
+    # Parameter combinations of a wide CSV, Parquet or Feather export, one row per run.
+    # A CSV sidecar is compressed like the export, going by its extension.
+    import pandas as pd
+
+    df = pd.DataFrame(parameter_columns(sweep))
+    sidecar = parameter_sidecar_path(path)
+    with perf_recorder.span('export_write'):
+        if file_format == "CSV":
+            digits = (precision or {}).get("parameters")
+            df.to_csv(sidecar, index=False, float_format=f"%.{int(digits)}g" if digits else None)
+        elif file_format == "Parquet":
+            df.to_parquet(sidecar, index=False)
+        else:
+            df.to_feather(sidecar)
+    return sidecar
+
+def iter_export_chunks(sweep, display_mode, selected_columns=None, chunk_rows=EXPORT_CHUNK_ROWS, layout="Long"):
+    # Yields (runs_done, total_runs, columns) for consecutive blocks of whole runs so
+    # that only one block of the long-format table is held in memory at a time. The
+    # wide layout is blocked by frequency points instead (iter_wide_chunks).
+    if layout == "Wide":
+        yield from iter_wide_chunks(sweep, display_mode, selected_columns, chunk_rows)
+        return
+    if isinstance(sweep, ProjectSweeps):
+        yield from sweep.iter_export_chunks(display_mode, selected_columns, chunk_rows)
+        return
+    runs_per_chunk = max(1, chunk_rows // max(1, sweep.n_freq))
+    for start in range(0, sweep.n_runs, runs_per_chunk):
+        stop = min(start + runs_per_chunk, sweep.n_runs)
+        with perf_recorder.span('export_build'):
+            columns = build_export_columns(sweep.select_runs(slice(start, stop)), display_mode,
+                                           selected_columns)
+        yield stop, sweep.n_runs, columns
+
+# Text export compression -> file extension, and the optional package each one needs
+COMPRESSIONS = {
+    "gzip": ".gz",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+COMPRESSION_MODULES = {
+    "zstd": "zstandard",
+}
+DEFAULT_COMPRESSION_LEVELS = {
+    "gzip": 6,
+    "xz": 1,
+    "zstd": 3,
+}
+
+def available_compressions():
+    return [name for name in COMPRESSIONS
+            if name not in COMPRESSION_MODULES or importlib.util.find_spec(COMPRESSION_MODULES[name])]
+
+def compressed_path(path, compression):
+    # Appends the compression's extension unless path already ends with it
+    if compression and not path.endswith(COMPRESSIONS[compression]):
+        return path + COMPRESSIONS[compression]
+    return path
+
+def open_text_output(path, compression=None, level=None):
+    # Text file for export output, compressed on the fly as it is written
+    if not compression:
+        return open(path, 'w', newline='')
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+    if compression == "gzip":
+        return gzip.open(path, 'wt', compresslevel=level, newline='')
+    if compression == "xz":
+        return lzma.open(path, 'wt', preset=level, newline='')
+    if compression == "zstd":
+        import zstandard
+        return io.TextIOWrapper(zstandard.ZstdCompressor(level=level).stream_writer(open(path, 'wb')), newline='')
+    raise ValueError(f"Unknown compression: {compression}")
+
+# Column types whose significant digits can be set for text exports
+PRECISION_TYPES = ("frequency", "parameters", "values")
+
+def csv_quote(value):
+    # Minimal quoting, as the csv module and pandas apply it
+    if any(char in value for char in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def csv_column_formats(names, param_names, precision=None):
+    # printf format per column: '%.<digits>g' where precision ({column type: significant
+    # digits}) sets them, else '%r', which writes floats at full precision as repr does
+    precision = precision or {}
+    formats = {}
+    for name in names:
+        if name == FREQUENCY_COLUMN:
+            digits = precision.get("frequency")
+        elif name in param_names or name == RUN_ID_COLUMN:
+            digits = precision.get("parameters")
+        else:
+            digits = precision.get("values")
+        formats[name] = f"%.{int(digits)}g" if digits else "%r"
+    return formats
+
+def csv_chunk_text(columns, formats):
+    # One block of rows as CSV text, from a single printf over all of its values. Columns
+    # holding text or missing values (written as empty fields) are formatted on their own.
+    fields = []
+    values = []
+    for name, arr in columns.items():
+        fmt = formats[name] if arr.dtype.kind == 'f' else "%r"
+        if fmt == "%r" and arr.dtype.kind == 'f' and arr.dtype.itemsize < 8:
+            # Single precision (complex64 sweeps): the shortest text that round-trips at
+            # the column's own precision, as pandas writes it, not that of the widened float
+            text = arr.astype(str)
+            text[np.isnan(arr)] = ''
+            fields.append("%s")
+            values.append(text.tolist())
+        elif arr.dtype.kind not in 'biuf' or (arr.dtype.kind == 'f' and np.isnan(arr).any()):
+            fields.append("%s")
+            values.append(['' if value is None or value != value else
+                           csv_quote(value) if isinstance(value, str) else fmt % value
+                           for value in arr.tolist()])
+        else:
+            fields.append(fmt)
+            values.append(arr.tolist())
+    if not values:
+        return ''
+    template = ','.join(fields) + '\n'
+    return (template * len(values[0])) % tuple(value for row in zip(*values) for value in row)
+
+def write_csv_streaming(path, sweep, display_mode, selected_columns=None,
+                        progress_callback=None, chunk_rows=EXPORT_CHUNK_ROWS, layout="Long",
+                        precision=None, compression=None, compression_level=None):
+    # Writes the header once and appends one block of runs at a time, each formatted by
+    # csv_chunk_text with the significant digits of precision and compressed on the fly
+    # with compression. progress_callback is called after every block with (runs_done,
+    # total_runs); returning False stops the export.
+    first = True
+    with open_text_output(path, compression, compression_level) as f:
+        for runs_done, total_runs, columns in iter_export_chunks(sweep, display_mode, selected_columns,
+                                                                 chunk_rows, layout):
+            with perf_recorder.span('export_write'):
+                if first:
+                    formats = csv_column_formats(columns, sweep.param_names, precision)
+                    f.write(','.join(csv_quote(name) for name in columns) + '\n')
+                    first = False
+                f.write(csv_chunk_text(columns, formats))
+            if progress_callback is not None and progress_callback(runs_done, total_runs) is False:
+                return False
+    return True
+
+def sweep_metadata(sweep, display_mode=None):
+    # Sweep parameters per run, stored alongside the table in the binary formats
+    if isinstance(sweep, ProjectSweeps):
+        metadata = {'projects': {name: sweep_metadata(project) for name, project in sweep.projects.items()}}
+    else:
+        metadata = {
+            'run_ids': sweep.run_ids.tolist(),
+            'parameters': {name: values.tolist() for name, values in sweep.param_values.items()},
+        }
+    if display_mode is not None:
+        metadata['display_mode'] = display_mode
+    return metadata
+
+def write_arrow(path, file_format, sweep, display_mode, selected_columns=None, progress_callback=None,
+                layout="Long"):
+    # Parquet (one row group per block of runs) or Feather/Arrow IPC (one record batch
+    # per block), with the sweep parameters in the schema metadata
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    metadata = {b'cst2csv': json.dumps(sweep_metadata(sweep, display_mode)).encode('utf-8')}
+    writer = None
+    try:
+        for runs_done, total_runs, columns in iter_export_chunks(sweep, display_mode, selected_columns,
+                                                                 layout=layout):
+            with perf_recorder.span('export_write'):
+                table = pa.table(columns)
+                if writer is None:
+                    schema = table.schema.with_metadata(metadata)
+                    if file_format == "Parquet":
+                        writer = pq.ParquetWriter(path, schema)
+                    else:
+                        writer = pa.ipc.new_file(path, schema)
+                writer.write_table(table.replace_schema_metadata(metadata))
+            if progress_callback is not None and progress_callback(runs_done, total_runs) is False:
+                return False
+    finally:
+        if writer is not None:
+            writer.close()
+    return True
+
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLUMNS = 16384
+
+def excel_rows(columns):
+    # Column arrays -> row lists for openpyxl; non-finite values (e.g. dB of zero) become empty cells
+    values = []
+    for arr in columns.values():
+        if arr.dtype.kind == 'f' and not np.isfinite(arr).all():
+            arr = np.where(np.isfinite(arr), arr, None)
+        values.append(arr.tolist())
+    return zip(*values)
+
+def discard_excel_sheets(workbook):
+    # Closes the write-only sheets of a workbook that will not be saved and deletes the
+    # temporary files openpyxl streams their rows into
+    for sheet in workbook.worksheets:
+        writer = getattr(sheet, '_writer', None)
+        if writer is None:
+            continue
+        if sheet._rows is not None:
+            sheet._rows.close()
+        writer.close()
+        if os.path.exists(writer.out):
+            writer.cleanup()
+
+def write_excel_streaming(path, sweep, display_mode, selected_columns=None, progress_callback=None,
+                          sheet_per_run=False, chunk_rows=EXPORT_CHUNK_ROWS, layout="Long"):
+    # Writes through openpyxl's write-only mode so rows go straight to disk. A sheet that
+    # reaches Excel's row limit rolls over to a new sheet; with sheet_per_run every
+    # parameter combination gets its own sheet, listed on a "Parameters" sheet. The wide
+    # layout lists the parameter combinations on a "Parameters" sheet as well.
+    from openpyxl import Workbook
+
+    if layout == "Wide":
+        header = wide_column_names(sweep, display_mode, selected_columns)
+        if len(header) > EXCEL_MAX_COLUMNS:
+            raise ValueError(f"The wide layout needs {len(header)} columns, more than Excel's "
+                             f"{EXCEL_MAX_COLUMNS}; use the long layout or fewer runs")
+        sheet_per_run = False
+    elif isinstance(sweep, ProjectSweeps):
+        if sheet_per_run:
+            raise ValueError("One sheet per run is not supported when exporting several projects")
+        header = sweep.column_names(display_mode, selected_columns)
+    else:
+        header = list(build_export_columns(sweep.select_runs(slice(0, 0)), display_mode, selected_columns))
+    workbook = Workbook(write_only=True)
+    if layout == "Wide":
+        index = workbook.create_sheet("Parameters")
+        index.append(list(parameter_columns(sweep)))
+        for row in excel_rows(parameter_columns(sweep)):
+            index.append(row)
+    if sheet_per_run:
+        index = workbook.create_sheet("Parameters")
+        index.append(["Sheet", "Run ID"] + sweep.param_names)
+        chunk_rows = 1  # one run per chunk
+
+    def open_sheet(title, part):
+        sheet = workbook.create_sheet(title if part == 1 else f"{title} ({part})")
+        sheet.append(header)
+        return sheet
+
+    completed = False
+    try:
+        sheet = None
+        for runs_done, total_runs, columns in iter_export_chunks(sweep, display_mode, selected_columns, chunk_rows,
+                                                                 layout):
+            if sheet_per_run:
+                run_idx = runs_done - 1
+                title = f"Run {sweep.run_ids[run_idx]}"
+                index.append([title, sweep.run_ids[run_idx].item()] + list(sweep.run_parameters(run_idx).values()))
+                sheet = None
+            if sheet is None:
+                part, rows = 1, 1
+                sheet = open_sheet(title if sheet_per_run else "Data", part)
+
+            with perf_recorder.span('export_write'):
+                for row in excel_rows(columns):
+                    if rows >= EXCEL_MAX_ROWS:
+                        part, rows = part + 1, 1
+                        sheet = open_sheet(title if sheet_per_run else "Data", part)
+                    sheet.append(row)
+                    rows += 1
+
+            if progress_callback is not None and progress_callback(runs_done, total_runs) is False:
+                return False
+
+        if sheet is None:
+            open_sheet("Data", 1)
+        with perf_recorder.span('export_write'):
+            workbook.save(path)
+        completed = True
+    finally:
+        if not completed:
+            discard_excel_sheets(workbook)
+    return True
+
+def write_hdf5(path, sweep, progress_callback=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Complex S-parameters stored natively as one runs x frequencies dataset per item in
+    # the 's_params' group, written in blocks of runs. Several projects get one group
+    # each, laid out the same way.
+    import h5py
+
+    with h5py.File(path, 'w') as f:
+        if not isinstance(sweep, ProjectSweeps):
+            return write_hdf5_group(f, sweep, progress_callback, chunk_rows)
+        runs_done = 0
+        for name, project in sweep.projects.items():
+            def report(done, _, offset=runs_done):
+                return progress_callback(offset + done, sweep.n_runs)
+            if not write_hdf5_group(f.create_group(name), project,
+                                    report if progress_callback is not None else None, chunk_rows):
+                return False
+            runs_done += project.n_runs
+    return True
+
+def write_hdf5_group(group, sweep, progress_callback=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    runs_per_chunk = max(1, chunk_rows // max(1, sweep.n_freq))
+    group.create_dataset('frequencies', data=sweep.frequencies)
+    group.create_dataset('run_ids', data=sweep.run_ids)
+    params = group.create_group('parameters')
+    for name, values in sweep.param_values.items():
+        params.create_dataset(name, data=values.astype('S') if values.dtype.kind == 'U' else values)
+    s_group = group.create_group('s_params')
+    datasets = {label: s_group.create_dataset(label, shape=(sweep.n_runs, sweep.n_freq), dtype=s_params.dtype)
+                for label, s_params in sweep.items.items()}
+    for start in range(0, sweep.n_runs, runs_per_chunk):
+        stop = min(start + runs_per_chunk, sweep.n_runs)
+        with perf_recorder.span('export_write'):
+            for label, dataset in datasets.items():
+                dataset[start:stop] = sweep.items[label][start:stop]
+        if progress_callback is not None and progress_callback(stop, sweep.n_runs) is False:
+            return False
+    return True
+
+def save_sweep_npz(file, sweep):
+    # Uncompressed .npz holding the complex S-parameter matrices natively, shared by
+    # the NPZ export and the result cache
+    params = {f'param_{i}': values for i, values in enumerate(sweep.param_values.values())}
+    items = {f's_params_{i}': s_params for i, s_params in enumerate(sweep.items.values())}
+    np.savez(file, run_ids=sweep.run_ids, frequencies=sweep.frequencies,
+             labels=np.array(json.dumps(sweep.labels)),
+             param_names=np.array(json.dumps(sweep.param_names)), **items, **params)
+
+def load_sweep_npz(file, store=None):
+    # With a SpillStore the S-parameter matrices are read into store arrays block by
+    # block rather than into RAM whole
+    with np.load(file, allow_pickle=False) as entry:
+        labels = json.loads(str(entry['labels']))
+        param_names = json.loads(str(entry['param_names']))
+        if store is None:
+            items = {label: entry[f's_params_{i}'] for i, label in enumerate(labels)}
+        else:
+            items = {}
+            for i, label in enumerate(labels):
+                with entry.zip.open(f's_params_{i}.npy') as fp:
+                    items[label] = store.read_npy(fp)
+        return SweepData(entry['frequencies'], items,
+                         {name: entry[f'param_{i}'] for i, name in enumerate(param_names)},
+                         entry['run_ids'], store=store)
+
+def run_in_order(executor, func, tasks, window):
+    # Yields func(task) for every task in order. With an executor at most window tasks
+    # are in flight, so task arguments are only built (and held) as results are consumed;
+    # without one the tasks run inline.
+    tasks = iter(tasks)
+    if executor is None:
+        for task in tasks:
+            yield func(task)
+        return
+    pending = deque(executor.submit(func, task) for _, task in zip(range(max(1, window)), tasks))
+    while pending:
+        result = pending.popleft().result()
+        for task in tasks:
+            pending.append(executor.submit(func, task))
+            break
+        yield result
+
+# Touchstone data format for each display mode: real/imaginary, magnitude/angle or dB/angle
+TOUCHSTONE_FORMATS = {
+    "Complex (Real + Imaginary)": 'RI',
+    "Magnitude": 'MA',
+    "Magnitude (dB)": 'DB',
+    "Magnitude and Phase": 'MA',
+}
+TOUCHSTONE_REFERENCE_OHMS = 50
+TOUCHSTONE_DIGITS = 9
+TOUCHSTONE_RUNS_PER_TASK = 16
+
+def sparameter_ports(label):
+    # 'S21' -> (2, 1), 'S1,12' -> (1, 12)
+    match = re.match(r'S(\d+),(\d+)$', label) or re.match(r'S(\d)(\d)$', label)
+    if not match:
+        raise ValueError(f"'{label}' is not an S-parameter")
+    return int(match.group(1)), int(match.group(2))
+
+def touchstone_layout(labels):
+    # Port count and the item labels in Touchstone order: S11 S21 S12 S22 for two ports,
+    # row by row otherwise. Every Sij of the ports has to be loaded.
+    ports = {sparameter_ports(label): label for label in labels}
+    n_ports = max(max(pair) for pair in ports)
+    if n_ports == 2:
+        order = [(1, 1), (2, 1), (1, 2), (2, 2)]
+    else:
+        order = [(i, j) for i in range(1, n_ports + 1) for j in range(1, n_ports + 1)]
+    missing = [sparameter_label(f"S{i},{j}") for i, j in order if (i, j) not in ports]
+    if missing:
+        raise ValueError(f"A {n_ports}-port Touchstone file needs every S-parameter; also load {', '.join(missing)}")
+    return n_ports, [ports[pair] for pair in order]
+
+def touchstone_template(n_ports, precision=None):
+    # printf template of one frequency point, with the frequency and value digits of
+    # precision (default TOUCHSTONE_DIGITS). More than two ports put every matrix row on
+    # its own lines of at most four value pairs, as Touchstone 1.0 requires.
+    precision = precision or {}
+    frequency = f"%.{int(precision.get('frequency') or TOUCHSTONE_DIGITS)}g"
+    number = f"%.{int(precision.get('values') or TOUCHSTONE_DIGITS)}g"
+    pair = f"{number} {number}"
+    if n_ports <= 2:
+        return frequency + f" {pair}" * n_ports ** 2 + '\n'
+    lines = [' '.join([pair] * min(4, n_ports - start)) for _ in range(n_ports) for start in range(0, n_ports, 4)]
+    return frequency + ' ' + '\n'.join(lines) + '\n'
+
+def touchstone_values(s_params, data_format):
+    # Complex values -> the two numbers of the data format, stacked on a new last axis
+    if data_format == 'RI':
+        return np.stack([s_params.real, s_params.imag], axis=-1)
+    first = np.abs(s_params)
+    if data_format == 'DB':
+        with np.errstate(divide='ignore'):
+            first = 20 * np.log10(first)
+    return np.stack([first, np.degrees(np.angle(s_params))], axis=-1)
+
+def touchstone_header(sweep, run_idx, data_format):
+    lines = ["! Exported by cst2csv", f"! Run ID: {sweep.run_ids[run_idx]}"]
+    lines += [f"! {name} = {value}" for name, value in sweep.run_parameters(run_idx).items()]
+    lines.append(f"# GHZ S {data_format} R {TOUCHSTONE_REFERENCE_OHMS}")
+    return '\n'.join(lines) + '\n'
+
+def format_touchstone_runs(task):
+    # Worker of write_touchstone, run in a process pool: formats a block of runs, each
+    # with a single printf over all of its numbers, and writes every run to its file, or
+    # returns the encoded text for the archive. Takes and returns picklable values only.
+    frequencies, values, headers, targets, template, archive = task
+    n_freq = len(frequencies)
+    results = []
+    for header, target, run_values in zip(headers, targets, values):
+        table = np.column_stack([frequencies, run_values.reshape(n_freq, -1)])
+        text = header + (template * n_freq) % tuple(table.ravel().tolist())
+        if archive:
+            results.append((target, text.encode('ascii')))
+        else:
+            with open(target, 'w', newline='\n') as f:
+                f.write(text)
+            results.append((target, None))
+    return results
+
+def touchstone_run_names(path, sweep, n_ports):
+    root = os.path.splitext(os.path.basename(path))[0]
+    return [f"{root}_run{run_id}.s{n_ports}p" for run_id in sweep.run_ids]
+
+def write_touchstone(path, sweep, display_mode, progress_callback=None, archive=False, max_workers=None,
+                     runs_per_task=TOUCHSTONE_RUNS_PER_TASK, precision=None):
+    # One .sNp file per run, named <name>_run<ID>.sNp, next to path or bundled into the
+    # ZIP archive at path. Blocks of runs are formatted in a process pool with a bounded
+    # number of blocks in flight; the data format (RI, MA or DB) follows display_mode.
+    # Files are written under temporary names and only replace existing ones once every
+    # run is written, so a cancelled or failed export leaves an earlier export intact.
+    if isinstance(sweep, ProjectSweeps):
+        raise ValueError("Touchstone export holds a single project; export the projects one by one")
+    n_ports, labels = touchstone_layout(sweep.labels)
+    data_format = TOUCHSTONE_FORMATS[display_mode]
+    template = touchstone_template(n_ports, precision)
+    names = touchstone_run_names(path, sweep, n_ports)
+    targets = names if archive else [os.path.join(os.path.dirname(os.path.abspath(path)), name) for name in names]
+    temp_targets = targets if archive else [target + '.tmp' for target in targets]
+    blocks = [(start, min(start + runs_per_task, sweep.n_runs)) for start in range(0, sweep.n_runs, runs_per_task)]
+
+    def task(block):
+        start, stop = block
+        with perf_recorder.span('export_build'):
+            values = touchstone_values(np.stack([sweep.items[label][start:stop] for label in labels], axis=2),
+                                       data_format)
+        headers = [touchstone_header(sweep, run_idx, data_format) for run_idx in range(start, stop)]
+        return sweep.frequencies, values, headers, temp_targets[start:stop], template, archive
+
+    workers = max(1, max_workers or os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(blocks) > 1 else None
+    # Archive members are compressed in this process, so the fastest level keeps up with the pool
+    bundle = zipfile.ZipFile(path + '.tmp', 'w', zipfile.ZIP_DEFLATED, compresslevel=1) if archive else None
+    completed = False
+    try:
+        runs_done = 0
+        for results in run_in_order(executor, format_touchstone_runs, map(task, blocks), 2 * workers):
+            with perf_recorder.span('export_write'):
+                for name, data in results:
+                    if bundle is not None:
+                        bundle.writestr(name, data)
+            runs_done += len(results)
+            if progress_callback is not None and progress_callback(runs_done, sweep.n_runs) is False:
+                return False
+        completed = True
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if bundle is not None:
+            bundle.close()
+        written = [(path + '.tmp', path)] if archive else zip(temp_targets, targets)
+        for temp_path, target in written:
+            if completed:
+                os.replace(temp_path, target)
+            elif os.path.exists(temp_path):
+                os.remove(temp_path)
+    return True
+
+def bucket_extrema(values, start, size):
+    # Frequency indices of the minimum and the maximum of each run within consecutive
+    # buckets of size points from start, as two runs x buckets arrays. The maximum is
+    # taken as the last maximal point, so a flat bucket still yields two distinct points.
+    n_runs, n_freq = values.shape
+    n_buckets = (n_freq - start) // size
+    blocks = values[:, start:start + n_buckets * size].reshape(n_runs, n_buckets, size)
+    offsets = start + size * np.arange(n_buckets)
+    return (offsets + np.argmin(blocks, axis=2),
+            offsets + size - 1 - np.argmax(blocks[:, :, ::-1], axis=2))
+
+def preview_indices(s_params, max_points, quantity='mag'):
+    # Frequency indices (runs x points, ascending per run) of a peak-preserving preview
+    # of compute_value_column(s_params, quantity), or None if every point fits. The axis
+    # is cut into buckets and the minimum and maximum of every bucket are kept, so the
+    # extrema of each run always appear in the preview, unlike a fixed stride. The values
+    # are derived one block of runs at a time, so a spilled matrix is never paged in whole.
+    n_runs, n_freq = s_params.shape
+    if not max_points or n_freq <= max_points:
+        return None
+    size = -(-n_freq // max(1, max_points // 2))
+    n_buckets = n_freq // size
+    tail = n_freq - n_buckets * size
+    indices = np.empty((n_runs, 2 * n_buckets + min(tail, 2)), dtype=np.intp)
+    step = block_rows(s_params)
+    for start in range(0, n_runs, step):
+        values = compute_value_column(s_params[start:start + step], quantity)
+        parts = list(bucket_extrema(values, 0, size))
+        if tail == 1:
+            parts.append(np.full((len(values), 1), n_freq - 1))
+        elif tail > 1:
+            parts.extend(bucket_extrema(values, n_freq - tail, tail))
+        indices[start:start + step] = np.sort(np.concatenate(parts, axis=1), axis=1)
+    return indices
+
+SUMMARY_BLOCK_RUNS = 256
+BANDWIDTH_THRESHOLD_DB = -10.0
+
+def compute_summary(frequencies, s_params, threshold_db=BANDWIDTH_THRESHOLD_DB):
+    # Per-run minimum S11 and the edges of the band below threshold_db that contains it,
+    # plus the global minimum. Runs are processed in blocks with whole-array operations;
+    # the comparisons use |S|^2 so the logarithm is only taken of the minima.
+    # Returns a dict of arrays: min_db, min_freq, band_start, band_end (NaN when the
+    # minimum does not reach the threshold), and best_run, the run index of the global minimum.
+    frequencies = np.asarray(frequencies)
+    n_runs = len(s_params)
+    n_freq = len(frequencies)
+    if n_runs == 0 or n_freq == 0:
+        raise ValueError("No data to summarize")
+    threshold_power = 10 ** (threshold_db / 10)
+
+    min_idx = np.zeros(n_runs, dtype=np.intp)
+    min_power = np.zeros(n_runs)
+    band_lo = np.zeros(n_runs, dtype=np.intp)
+    band_hi = np.zeros(n_runs, dtype=np.intp)
+    freq_idx = np.arange(n_freq)
+
+    for start in range(0, n_runs, SUMMARY_BLOCK_RUNS):
+        stop = min(start + SUMMARY_BLOCK_RUNS, n_runs)
+        block = np.asarray(s_params[start:stop])
+        power = block.real ** 2 + block.imag ** 2
+        # Points a resampled run does not cover (NaN) bound the band like samples above it
+        power[np.isnan(power)] = np.inf
+        block_min = np.argmin(power, axis=1)
+        min_idx[start:stop] = block_min
+        min_power[start:stop] = power[np.arange(stop - start), block_min]
+
+        # The band is bounded by the nearest samples above the threshold on either side
+        above = power > threshold_power
+        before = above & (freq_idx <= block_min[:, None])
+        after = above & (freq_idx >= block_min[:, None])
+        band_lo[start:stop] = np.where(before, freq_idx, -1).max(axis=1) + 1
+        band_hi[start:stop] = np.where(after, freq_idx, n_freq).min(axis=1) - 1
+
+    with np.errstate(divide='ignore'):
+        min_db = 10 * np.log10(min_power)
+    in_band = min_power <= threshold_power
+    band_start = np.where(in_band, frequencies[np.clip(band_lo, 0, n_freq - 1)], np.nan)
+    band_end = np.where(in_band, frequencies[np.clip(band_hi, 0, n_freq - 1)], np.nan)
+    return {
+        'min_db': min_db,
+        'min_freq': frequencies[min_idx],
+        'band_start': band_start,
+        'band_end': band_end,
+        'best_run': int(np.argmin(min_db)),
+    }
+
+def append_summary(summary, new_summary):
+    # compute_summary of a sweep followed by compute_summary of runs appended to it
+    merged = {key: np.concatenate([summary[key], new_summary[key]]) for key in summary if key != 'best_run'}
+    merged['best_run'] = int(np.argmin(merged['min_db']))
+    return merged
+
+def write_export(path, file_format, sweep, display_mode, selected_columns=None,
+                 progress_callback=None, stream=True, excel_sheet_per_run=False, layout="Long", workers=None,
+                 precision=None, compression=None, compression_level=None):
+    # Writes the filtered sweep in the given export format. Tabular formats get the
+    # long- or wide-format table (a wide CSV, Parquet or Feather file gets a
+    # <name>_parameters sidecar); HDF5 and NPZ store the complex S-parameter matrices
+    # natively in either layout, and Touchstone writes one .sNp file per run on up to
+    # workers processes. The text formats (CSV, Touchstone) are written with the
+    # significant digits of precision ({column type: digits}, see PRECISION_TYPES), and
+    # CSV can be compressed while it is written. Returns False if the export was
+    # cancelled through progress_callback. The file is written under a temporary name
+    # and only replaces an existing one once it is complete, so a cancelled or failed
+    # export leaves an earlier export intact.
+    if layout not in EXPORT_LAYOUTS:
+        raise ValueError(f"Unknown export layout: {layout}")
+    if compression and file_format != "CSV":
+        raise ValueError("Only CSV exports can be compressed")
+    if compression and compression not in available_compressions():
+        raise ValueError(f"{compression} compression is not available; install {COMPRESSION_MODULES.get(compression)}")
+    if layout == "Wide" and isinstance(sweep, ProjectSweeps):
+        raise ValueError("The wide layout needs one frequency axis; export several projects in the long layout")
+    if not sweep.labels:
+        raise ValueError("No S-parameter items to export; select at least one")
+    if file_format in ("Touchstone", "Touchstone (ZIP)"):
+        return write_touchstone(path, sweep, display_mode, progress_callback,
+                                archive=file_format == "Touchstone (ZIP)", max_workers=workers,
+                                precision=precision)
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+
+    temp_path = path + '.tmp'
+    completed = False
+    try:
+        completed = write_export_file(temp_path, file_format, sweep, display_mode, selected_columns,
+                                      progress_callback, stream, excel_sheet_per_run, layout, precision,
+                                      compression, compression_level)
+    finally:
+        if completed:
+            os.replace(temp_path, path)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+    if completed and layout == "Wide" and file_format in ("CSV", "Parquet", "Feather"):
+        write_parameter_sidecar(path, file_format, sweep, precision)
+    return completed
+
+def write_export_file(path, file_format, sweep, display_mode, selected_columns, progress_callback, stream,
+                      excel_sheet_per_run, layout, precision, compression, compression_level):
+    # The single-file formats of write_export, written directly to path
+    if layout == "Wide" and file_format == "CSV":
+        return write_csv_streaming(path, sweep, display_mode, selected_columns, progress_callback,
+                                   layout=layout, precision=precision, compression=compression,
+                                   compression_level=compression_level)
+    if layout == "Wide" and file_format in ("Parquet", "Feather"):
+        return write_arrow(path, file_format, sweep, display_mode, selected_columns, progress_callback,
+                           layout=layout)
+    if file_format == "CSV" and (stream or isinstance(sweep, ProjectSweeps) or precision or compression):
+        return write_csv_streaming(path, sweep, display_mode, selected_columns, progress_callback,
+                                   precision=precision, compression=compression,
+                                   compression_level=compression_level)
+    if file_format == "Excel":
+        return write_excel_streaming(path, sweep, display_mode, selected_columns, progress_callback,
+                                     sheet_per_run=excel_sheet_per_run, layout=layout)
+    if file_format in ("Parquet", "Feather"):
+        return write_arrow(path, file_format, sweep, display_mode, selected_columns, progress_callback)
+    if file_format == "HDF5":
+        return write_hdf5(path, sweep, progress_callback)
+    if file_format == "NumPy (NPZ)":
+        if isinstance(sweep, ProjectSweeps):
+            raise ValueError("NPZ export holds a single project; use HDF5 to export several projects natively")
+        with perf_recorder.span('export_write'), open(path, 'wb') as f:
+            save_sweep_npz(f, sweep)
+        if progress_callback is not None:
+            progress_callback(sweep.n_runs, sweep.n_runs)
+        return True
+
+    import pandas as pd
+
+    with perf_recorder.span('export_build'):
+        df = pd.DataFrame(build_export_columns(sweep, display_mode, selected_columns))
+    with perf_recorder.span('export_write'):
+        df.to_csv(path, index=False)
+    if progress_callback is not None:
+        progress_callback(sweep.n_runs, sweep.n_runs)
+    return True
+
+def run_export_job(job, progress_callback=None):
+    # One job of an export queue. job holds the arguments of write_export by name
+    # ('path', 'file_format', 'sweep', 'display_mode' and any of the options). A
+    # tabular job first materializes the derived values it needs, which the other jobs
+    # over the same view then share through its DerivedCache.
+    options = dict(job)
+    path, file_format, sweep, display_mode = (options.pop(key) for key in
+                                              ('path', 'file_format', 'sweep', 'display_mode'))
+    if file_format in TABULAR_EXPORT_FORMATS:
+        with perf_recorder.span('export_build'):
+            sweep.materialize(display_mode, options.get('selected_columns'))
+    return write_export(path, file_format, sweep, display_mode, progress_callback=progress_callback, **options)
+
+# Common frequency grids that runs with different frequency axes (e.g. adaptive frequency
+# sweeps) are resampled onto. A grid is given as a tuple: ("Linear", start, stop, points),
+# evenly spaced points (start/stop None: the range all runs cover, points None: as many
+# as the longest run has), the default; ("Reference Run", run_id), the axis of one run
+# (None: the first run); ("Union",), the sorted union of every run's axis, which grows
+# with runs x points and is refused above MAX_UNION_GRID_POINTS. An array of frequencies
+# is used as it is.
+FREQUENCY_GRIDS = ("Linear", "Reference Run", "Union")
+DEFAULT_FREQUENCY_GRID = ("Linear", None, None, None)
+MAX_UNION_GRID_POINTS = 100000
+
+def frequency_grid_key(grid):
+    # Text identifying a grid, for cache keys
+    if grid is None:
+        return ''
+    if isinstance(grid, np.ndarray):
+        return hashlib.sha1(np.ascontiguousarray(grid, dtype=float).tobytes()).hexdigest()
+    return repr(tuple(grid))
+
+def common_frequency_grid(axes, run_ids, grid=None):
+    # The frequency axis for runs sampled at axes (one ascending array per run)
+    if isinstance(grid, np.ndarray):
+        return np.asarray(grid, dtype=float)
+    grid = grid or DEFAULT_FREQUENCY_GRID
+    kind = grid[0]
+    if kind == "Union":
+        union = np.unique(np.concatenate(axes))
+        if len(union) > MAX_UNION_GRID_POINTS:
+            raise ValueError(f"The union of the runs' frequencies has {len(union)} points (at most "
+                             f"{MAX_UNION_GRID_POINTS}); use a linear or reference run grid")
+        return union
+    if kind == "Reference Run":
+        run_id = grid[1] if len(grid) > 1 else None
+        if run_id is None:
+            return axes[0]
+        matches = [i for i, other in enumerate(run_ids) if other == run_id]
+        if not matches:
+            raise ValueError(f"Reference run {run_id} is not loaded")
+        return axes[matches[0]]
+    if kind == "Linear":
+        _, start, stop, points = grid
+        start = max(axis[0] for axis in axes) if start is None else start
+        stop = min(axis[-1] for axis in axes) if stop is None else stop
+        points = max(len(axis) for axis in axes) if points is None else points
+        if int(points) < 2 or stop <= start:
+            raise ValueError("A linear grid needs at least two points and a start below its stop")
+        return np.linspace(start, stop, int(points))
+    raise ValueError(f"Unknown frequency grid: {kind}")
+
+def resample_runs(axes, values, grid, out):
+    # Linear interpolation of every run (values[i] sampled at the ascending axes[i]) onto
+    # grid, written into out (runs x grid points). All runs are flattened into one array
+    # whose keys are the frequencies shifted by run, so one searchsorted per block of
+    # runs locates every grid point in every run; there is no per-run Python work. Grid
+    # points outside a run's own range are NaN.
+    n_runs = len(axes)
+    lengths = np.array([len(axis) for axis in axes])
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    x = np.concatenate(axes).astype(float)
+    y = np.concatenate(values)
+    low = min(x.min(), grid.min())
+    span = 2 * (max(x.max(), grid.max()) - low) + 1
+    keys = (x - low) + np.repeat(np.arange(n_runs), lengths) * span
+    step = block_rows(out)
+    for start in range(0, n_runs, step):
+        runs = np.arange(start, min(start + step, n_runs))
+        first = offsets[runs][:, None]
+        last = offsets[runs + 1][:, None] - 1
+        right = np.searchsorted(keys, (grid - low)[None, :] + runs[:, None] * span)
+        right = np.minimum(np.maximum(right, first + 1), last)
+        left = np.maximum(right - 1, first)
+        x0, x1 = x[left], x[right]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(x1 > x0, (grid[None, :] - x0) / (x1 - x0), 0.0)
+        block = y[left] + weight * (y[right] - y[left])
+        block[(grid[None, :] < x[first]) | (grid[None, :] > x[last])] = np.nan
+        out[start:start + len(runs)] = block
+    return out
+
+def resample_shared(axis, s_params, grid, out):
+    # resample_runs for runs (the rows of s_params) that share one ascending axis: the
+    # interpolation indices and weights are computed once and applied to blocks of runs
+    right = np.clip(np.searchsorted(axis, grid), 1, max(1, len(axis) - 1))
+    left = np.maximum(right - 1, 0)
+    right = np.minimum(right, len(axis) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(axis[right] > axis[left], (grid - axis[left]) / (axis[right] - axis[left]), 0.0)
+    outside = (grid < axis[0]) | (grid > axis[-1])
+    step = block_rows(s_params)
+    for start in range(0, len(s_params), step):
+        block = np.asarray(s_params[start:start + step])
+        values = block[:, left] + weight * (block[:, right] - block[:, left])
+        values[:, outside] = np.nan
+        out[start:start + step] = values
+    return out
+
+class LoadCancelled(Exception):
+    pass
+
+def fetch_cst_runs(project_path, result_path=S11_RESULT_PATH, max_workers=DEFAULT_LOAD_WORKERS,
+                   progress_callback=None, cancel_event=None, results_module=None, run_ids=None,
+                   parameters=None, store=None, frequency_grid=None):
+    # Reads every run of result_path, or only those in run_ids, into a SweepData, fanning
+    # the per-run calls out over a small thread pool. Runs are stored in run-ID order, in
+    # a matrix allocated by store (a SpillStore) if one is given. If the runs do not share
+    # one frequency axis, they are resampled onto frequency_grid (default: evenly spaced
+    # over their common range, see FREQUENCY_GRIDS) with resample_runs; an array or
+    # "Linear" grid resamples runs on a shared axis too.
+    # parameters, the parameter dicts of run_ids if already known (fetch_parameter_index),
+    # saves the get_parameter_combination calls. results_module defaults to cst.results
+    # and can be replaced by a stub.
+    if results_module is None:
+        import cst.results as results_module
+    with perf_recorder.span('project_open'):
+        project = results_module.ProjectFile(project_path, allow_interactive=True)
+
+    # Each worker thread gets its own 3D results handle
+    local = threading.local()
+    def results_3d():
+        if not hasattr(local, 'handle'):
+            local.handle = project.get_3d()
+        return local.handle
+
+    def fetch_run(run_id, run_parameters=None):
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelled()
+        handle = results_3d()
+        with perf_recorder.span('get_result_item'):
+            item = handle.get_result_item(result_path, run_id)
+            xdata, ydata = np.array(item.get_xdata()), np.array(item.get_ydata())
+        if run_parameters is None:
+            with perf_recorder.span('get_parameter_combination'):
+                run_parameters = handle.get_parameter_combination(run_id)
+        return xdata, ydata, run_parameters
+
+    if run_ids is None:
+        run_ids = list(results_3d().get_run_ids(result_path))
+    if not run_ids:
+        raise ValueError(f"No runs found for '{result_path}'")
+
+    # Each run is copied into its row of the store as soon as it arrives. Once a run
+    # arrives on a different frequency axis, every run is kept with its own axis instead.
+    s_params = None
+    frequencies = None
+    ragged = None  # run index -> (ascending axis, values)
+    known_parameters = parameters if parameters is not None else [None] * len(run_ids)
+    parameters = [None] * len(run_ids)
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        futures = {pool.submit(fetch_run, run_id, known_parameters[i]): i for i, run_id in enumerate(run_ids)}
+        arrived = []
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                run_idx = futures[future]
+                xdata, ydata, parameters[run_idx] = future.result()
+                if s_params is None:
+                    shape = (len(run_ids), len(ydata))
+                    s_params = store.allocate(shape) if store is not None else np.empty(shape, dtype=complex)
+                    frequencies = xdata
+                if ragged is None and not np.array_equal(xdata, frequencies):
+                    ragged = {i: sorted_run(frequencies, s_params[i]) for i in arrived}
+                if ragged is None:
+                    s_params[run_idx] = ydata
+                else:
+                    ragged[run_idx] = sorted_run(xdata, ydata)
+                arrived.append(run_idx)
+                if progress_callback is not None:
+                    progress_callback(done, len(run_ids))
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LoadCancelled()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    if ragged is not None:
+        axes, values = zip(*(ragged[i] for i in range(len(run_ids))))
+        return resample_sweep(axes, values, run_ids, result_path, parameters, store, frequency_grid)
+    frequencies = np.asarray(frequencies, dtype=float)
+    if np.any(np.diff(frequencies) < 0):
+        # Range selection relies on an ascending frequency axis
+        order = np.argsort(frequencies, kind='stable')
+        frequencies = frequencies[order]
+        step = block_rows(s_params)
+        for start in range(0, len(s_params), step):
+            s_params[start:start + step] = s_params[start:start + step][:, order]
+    if isinstance(frequency_grid, np.ndarray) or (frequency_grid and frequency_grid[0] == "Linear"):
+        if not np.array_equal(frequencies, frequency_grid):
+            return resample_sweep([frequencies] * len(run_ids), s_params, run_ids, result_path, parameters,
+                                  store, frequency_grid)
+    return SweepData(frequencies, {sparameter_label(result_path): s_params}, parameter_table(parameters), run_ids,
+                     store=store)
+
+def sorted_run(xdata, ydata):
+    # A run's axis (as floats) and values in ascending frequency order
+    xdata = np.asarray(xdata, dtype=float)
+    if np.any(np.diff(xdata) < 0):
+        order = np.argsort(xdata, kind='stable')
+        return xdata[order], ydata[order]
+    return xdata, ydata
+
+def resample_sweep(axes, values, run_ids, result_path, parameters, store=None, frequency_grid=None):
+    # SweepData of runs on their own frequency axes, resampled onto their common grid.
+    # values is a list of per-run arrays, or a runs x frequencies matrix if every run
+    # is on axes[0].
+    with perf_recorder.span('resample'):
+        grid = common_frequency_grid(axes, run_ids, frequency_grid)
+        shape = (len(run_ids), len(grid))
+        out = store.allocate(shape) if store is not None else np.empty(shape, dtype=complex)
+        if isinstance(values, np.ndarray):
+            resample_shared(axes[0], values, grid, out)
+        else:
+            resample_runs(axes, values, grid, out)
+    return SweepData(grid, {sparameter_label(result_path): out}, parameter_table(parameters), run_ids, store=store)
+
+def fetch_parameter_index(project_path, result_path=S11_RESULT_PATH, max_workers=DEFAULT_LOAD_WORKERS,
+                          results_module=None, run_ids=None):
+    # Run IDs of result_path (or run_ids) and their parameter dicts, read with
+    # get_parameter_combination alone so runs can be filtered before any S-parameter
+    # data is pulled
+    if results_module is None:
+        import cst.results as results_module
+    with perf_recorder.span('project_open'):
+        project = results_module.ProjectFile(project_path, allow_interactive=True)
+    local = threading.local()
+
+    def fetch_parameters(run_id):
+        if not hasattr(local, 'handle'):
+            local.handle = project.get_3d()
+        with perf_recorder.span('get_parameter_combination'):
+            return local.handle.get_parameter_combination(run_id)
+
+    if run_ids is None:
+        run_ids = list(project.get_3d().get_run_ids(result_path))
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        parameters = list(pool.map(fetch_parameters, run_ids))
+    return run_ids, parameters
+
+def filter_parameter_index(run_ids, parameters, run_filter):
+    mask = run_filter_mask(parameter_table(parameters), run_filter)
+    return ([run_id for run_id, match in zip(run_ids, mask) if match],
+            [params for params, match in zip(parameters, mask) if match])
+
+class ResultCache:
+    # On-disk cache of extracted runs, one uncompressed .npz file per project and result
+    # path. Entries are keyed on the project's path, modification time and size, so a
+    # re-simulated project is never served stale data. The least recently used entries
+    # are evicted once the cache grows beyond max_bytes.
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get('cache_enabled', True):
+            return None
+        return cls(config.get('cache_dir') or DEFAULT_CACHE_DIR,
+                   int(config.get('cache_max_mb', DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+
+    def entry_path(self, project_path, result_path, frequency_grid=None):
+        # Sweeps resampled onto a chosen frequency grid are cached under their own entry
+        stat = os.stat(project_path)
+        key = f"{os.path.abspath(project_path)}|{stat.st_mtime_ns}|{stat.st_size}|{result_path}"
+        if frequency_grid is not None:
+            key += f"|{frequency_grid_key(frequency_grid)}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npz')
+
+    def load(self, project_path, result_path, store=None, frequency_grid=None):
+        try:
+            path = self.entry_path(project_path, result_path, frequency_grid)
+            sweep = load_sweep_npz(path, store)
+            os.utime(path)  # mark as recently used
+        except (OSError, KeyError, ValueError):
+            return None
+        return sweep
+
+    def store(self, project_path, result_path, sweep, frequency_grid=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(project_path, result_path, frequency_grid)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            save_sweep_npz(f, sweep)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith('.npz')]
+        return sorted(paths, key=os.path.getmtime)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(os.path.getsize(path) for path in entries)
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        for path in self.entries():
+            os.remove(path)
+
+def list_sparameter_items(project_path, results_module=None):
+    # Result paths of every Sij item in the project's S-parameter folder
+    if results_module is None:
+        import cst.results as results_module
+    project = results_module.ProjectFile(project_path, allow_interactive=True)
+    return [item for item in project.get_3d().get_tree_items()
+            if item.startswith(SPARAMETER_FOLDER) and re.match(r'S\d+,\d+$', item[len(SPARAMETER_FOLDER):])]
+
+def load_cst_runs(project_path, result_path=S11_RESULT_PATH, cache=None, run_filter=None, **fetch_kwargs):
+    # fetch_cst_runs with a ResultCache in front of it. With a run_filter, a cached sweep
+    # is filtered in memory; otherwise the parameter index is read first and only the
+    # matching runs are fetched (a partial sweep is not cached).
+    if cache is not None:
+        sweep = cache.load(project_path, result_path, fetch_kwargs.get('store'), fetch_kwargs.get('frequency_grid'))
+        if sweep is not None:
+            if run_filter:
+                sweep = sweep.take_runs(np.flatnonzero(run_filter_mask(sweep.param_values, run_filter)))
+                if not sweep.n_runs:
+                    raise ValueError(f"No runs match '{run_filter}'")
+            return sweep
+    if run_filter:
+        run_ids, parameters = filter_parameter_index(*fetch_parameter_index(
+            project_path, result_path, fetch_kwargs.get('max_workers', DEFAULT_LOAD_WORKERS),
+            fetch_kwargs.get('results_module')), run_filter)
+        if not run_ids:
+            raise ValueError(f"No runs match '{run_filter}'")
+        return fetch_cst_runs(project_path, result_path, run_ids=run_ids, parameters=parameters, **fetch_kwargs)
+    sweep = fetch_cst_runs(project_path, result_path, **fetch_kwargs)
+    if cache is not None:
+        try:
+            cache.store(project_path, result_path, sweep, fetch_kwargs.get('frequency_grid'))
+        except OSError:
+            pass
+    return sweep
+
+def fetch_new_runs(project_path, sweep, result_paths, results_module=None, run_filter=None, **fetch_kwargs):
+    # Watch-mode refresh: diffs the project's run IDs against those already in sweep and
+    # reads only the new runs of each result path (that match run_filter) into a
+    # SweepData for append_runs, or returns None if there are none. New runs on other
+    # frequencies are resampled onto the axis of sweep.
+    fetch_kwargs.pop('frequency_grid', None)
+    if results_module is None:
+        import cst.results as results_module
+    project = results_module.ProjectFile(project_path, allow_interactive=True)
+    known = set(sweep.run_ids.tolist())
+    new_ids = [run_id for run_id in project.get_3d().get_run_ids(result_paths[0]) if run_id not in known]
+    parameters = None
+    if new_ids and run_filter:
+        new_ids, parameters = filter_parameter_index(*fetch_parameter_index(
+            project_path, result_paths[0], fetch_kwargs.get('max_workers', DEFAULT_LOAD_WORKERS),
+            results_module, new_ids), run_filter)
+    if not new_ids:
+        return None
+    new_runs = None
+    for result_path in result_paths:
+        item = fetch_cst_runs(project_path, result_path, results_module=results_module, run_ids=new_ids,
+                              parameters=parameters, frequency_grid=sweep.frequencies, **fetch_kwargs)
+        new_runs = item if new_runs is None else new_runs.with_items(item)
+    return new_runs
+
+def load_cst_items(project_path, result_paths, cache=None, **fetch_kwargs):
+    # Loads several S-parameter items of one project into a single SweepData
+    sweep = None
+    for result_path in result_paths:
+        item = load_cst_runs(project_path, result_path, cache, **fetch_kwargs)
+        sweep = item if sweep is None else sweep.with_items(item)
+    return sweep
+
+def load_sweep_item(project_path, result_path, sweep, cache=None, **fetch_kwargs):
+    # A further S-parameter item of the project sweep was loaded from, on the runs and
+    # frequency axis of sweep so that sweep.with_items accepts it. A cached item is used
+    # if it holds those runs on that axis; otherwise (watch mode has appended runs since
+    # it was cached, or the cache is stale) exactly sweep.run_ids are read and resampled
+    # onto sweep.frequencies.
+    if cache is not None:
+        item = cache.load(project_path, result_path, fetch_kwargs.get('store'), fetch_kwargs.get('frequency_grid'))
+        if (item is not None and np.array_equal(item.frequencies, sweep.frequencies)
+                and np.isin(sweep.run_ids, item.run_ids).all()):
+            if np.array_equal(item.run_ids, sweep.run_ids):
+                return item
+            return item.take_runs(np.searchsorted(item.run_ids, sweep.run_ids))
+    fetch_kwargs['frequency_grid'] = sweep.frequencies
+    parameters = [sweep.run_parameters(run_idx) for run_idx in range(sweep.n_runs)]
+    return fetch_cst_runs(project_path, result_path, run_ids=sweep.run_ids.tolist(), parameters=parameters,
+                          **fetch_kwargs)
+
+def load_projects(project_paths, result_paths, cache=None, concurrency=None, **fetch_kwargs):
+    # Loads several projects concurrently, one thread per project, into a ProjectSweeps
+    # keyed by project_names
+    with ThreadPoolExecutor(max_workers=max(1, concurrency or len(project_paths))) as pool:
+        futures = [pool.submit(load_cst_items, path, result_paths, cache, **fetch_kwargs) for path in project_paths]
+        return ProjectSweeps(zip(project_names(project_paths), [future.result() for future in futures]))
 
 def load_config():
     try:
@@ -84,615 +1888,287 @@ def save_config(config):
     with open(CONFIG_FILE, 'w') as f:
         json.dump(config, f)
 
-def setup_cst_path(parent=None):
-    config = load_config()
-    current_path = config.get('cst_library_path')
+def add_cst_library_path(path):
+    if path and path not in sys.path:
+        sys.path.append(path)
+
+def check_cst_library_path(config):
+    # Lightweight check that config['cst_library_path'] holds a cst package with a
+    # results module, without importing it. A passing check is cached in config.json
+    # with the package's modification time, so later startups only stat the package.
+    path = config.get('cst_library_path')
+    if not path:
+        return False
+    package = os.path.join(path, 'cst')
     try:
-        import cst.results
-    except ImportError:
-        current_path = None
-    
-    # Check if path exists and is valid
-    path_valid = False
-    if current_path:
-        try:
-            sys.path.append(current_path)
-            import cst.results
-            path_valid = True
-        except ImportError:
-            sys.path.remove(current_path)
-    
-    # Show dialog if no path or invalid path
-    if not path_valid:
-        dialog = LibraryPathDialog(parent, current_path)
-        if dialog.exec_() == QDialog.Accepted:
-            new_path = dialog.get_path()
-            try:
-                sys.path.append(new_path)
-                import cst.results
-                config['cst_library_path'] = new_path
-                save_config(config)
-                return True
-            except ImportError:
-                sys.path.remove(new_path)
-                QtWidgets.QMessageBox.critical(parent, "Error", 
-                    "Could not find CST Python libraries in the selected path.\n"
-                    "Please make sure you select the correct directory containing 'cst' module.")
-                return setup_cst_path(parent)  # Try again
+        signature = [os.path.abspath(path), os.stat(package).st_mtime_ns]
+        if config.get('cst_library_check') == signature:
+            return True
+        if not any(name.split('.')[0] == 'results' for name in os.listdir(package)):
+            return False
+    except OSError:
         return False
+    config['cst_library_check'] = signature
+    save_config(config)
     return True
 
-class CSTExportApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.parameter_checkboxes = {}
-        self.freq_data = None
-        self.s_parameters = None
-        self.parameters = None
-        self.full_data = None
-        self.MAX_DISPLAY_ROWS = 500
-        self.initUI()
-
-    def initUI(self):
-        self.setWindowTitle("CST to CSV Export Tool")
-        self.setGeometry(100, 100, 1200, 800)
-
-        # Create menu bar
-        menubar = self.menuBar()
-        settings_menu = menubar.addMenu('Settings')
-        
-        # Add CST Library Path action
-        change_path_action = settings_menu.addAction('Change CST Library Path')
-        change_path_action.triggered.connect(self.change_library_path)
-
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-
-        # Set application icon
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_icon.svg')
-        self.setWindowIcon(QtGui.QIcon(icon_path))
-
-        # File selection section
-        file_group = QGroupBox("File Selection")
-        file_layout = QHBoxLayout()
-        self.filePathLineEdit = QLineEdit()
-        self.browseButton = QPushButton("Browse")
-        self.browseButton.clicked.connect(self.browseFile)
-        file_layout.addWidget(self.filePathLineEdit)
-        file_layout.addWidget(self.browseButton)
-        file_group.setLayout(file_layout)
-        main_layout.addWidget(file_group)
-
-        # Create tab widget
-        self.tab_widget = QTabWidget()
-        main_layout.addWidget(self.tab_widget)
-
-        # Data tab
-        data_tab = QWidget()
-        data_layout = QVBoxLayout(data_tab)
-
-        # S11 Display Options
-        display_group = QGroupBox("S11 Display Options")
-        display_layout = QHBoxLayout()
-        self.display_mode = QComboBox()
-        self.display_mode.addItems([
-            "Complex (Real + Imaginary)",
-            "Magnitude",
-            "Magnitude (dB)",
-            "Magnitude and Phase"
-        ])
-        self.display_mode.currentIndexChanged.connect(self.update_display)
-        display_layout.addWidget(self.display_mode)
-        display_group.setLayout(display_layout)
-        data_layout.addWidget(display_group)
-
-        # Frequency range selection
-        freq_group = QGroupBox("Frequency Range Selection")
-        freq_layout = QHBoxLayout()
-        
-        self.freq_start = QLineEdit()
-        self.freq_start.setPlaceholderText("Start Frequency (GHz)")
-        
-        self.freq_end = QLineEdit()
-        self.freq_end.setPlaceholderText("End Frequency (GHz)")
-        
-        freq_layout.addWidget(QLabel("Start Frequency:"))
-        freq_layout.addWidget(self.freq_start)
-        freq_layout.addWidget(QLabel("End Frequency:"))
-        freq_layout.addWidget(self.freq_end)
-        
-        self.use_all_freq = QCheckBox("Use All Frequencies")
-        self.use_all_freq.setChecked(True)
-        self.use_all_freq.stateChanged.connect(self.toggle_freq_range)
-        freq_layout.addWidget(self.use_all_freq)
-        
-        self.apply_freq_range = QPushButton("Apply Range")
-        self.apply_freq_range.clicked.connect(self.update_display)
-        freq_layout.addWidget(self.apply_freq_range)
-        
-        freq_group.setLayout(freq_layout)
-        data_layout.addWidget(freq_group)
-
-        # Results table with header checkboxes
-        table_group = QGroupBox("Results")
-        table_layout = QVBoxLayout()
-        
-        self.header_widget = QWidget()
-        self.header_layout = QHBoxLayout()
-        self.header_layout.setSpacing(0)
-        self.header_layout.setContentsMargins(0, 0, 0, 0)
-        self.header_widget.setLayout(self.header_layout)
-        table_layout.addWidget(self.header_widget)
-        
-        self.tableWidget = QTableWidget()
-        self.tableWidget.setMinimumHeight(400)
-        table_layout.addWidget(self.tableWidget)
-        
-        table_group.setLayout(table_layout)
-        data_layout.addWidget(table_group)
-
-        # Export section
-        export_group = QGroupBox("Export Options")
-        export_layout = QHBoxLayout()
-        
-        # File format selection
-        export_layout.addWidget(QLabel("Export Format:"))
-        self.export_format = QComboBox()
-        self.export_format.addItems(["CSV", "Excel"])
-        export_layout.addWidget(self.export_format)
-        
-        # Export button
-        self.exportButton = QPushButton("Export...")
-        self.exportButton.clicked.connect(self.exportData)
-        export_layout.addWidget(self.exportButton)
-        export_layout.addStretch()
-        
-        export_group.setLayout(export_layout)
-        data_layout.addWidget(export_group)
-
-        # Summary tab
-        summary_tab = QWidget()
-        summary_layout = QVBoxLayout(summary_tab)
-        
-        self.summary_text = QTextEdit()
-        self.summary_text.setReadOnly(True)
-        summary_layout.addWidget(self.summary_text)
-
-        # Add tabs to tab widget
-        self.tab_widget.addTab(data_tab, "Data")
-        self.tab_widget.addTab(summary_tab, "Summary")
-
-        # Style everything
-        self.apply_styles()
-
-    def apply_styles(self):
-        # Use monospace font
-        font = QtGui.QFont("Consolas", 9)
-        self.setFont(font)
-        
-        self.setStyleSheet("""
-            QMainWindow {
-                background: white;
-            }
-            QGroupBox {
-                font-family: Consolas;
-                font-weight: bold;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                margin-top: 1ex;
-                padding: 10px;
-                background: white;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 3px 0 3px;
-                color: #2c3e50;
-            }
-            QPushButton {
-                font-family: Consolas;
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 5px 15px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QPushButton:pressed {
-                background-color: #3d8b40;
-            }
-            QLineEdit, QTextEdit {
-                font-family: Consolas;
-                padding: 5px;
-                border: 1px solid #ddd;
-                border-radius: 3px;
-            }
-            QComboBox {
-                font-family: Consolas;
-                padding: 5px;
-                border: 1px solid #ddd;
-                border-radius: 3px;
-            }
-            QLabel {
-                font-family: Consolas;
-            }
-            QTableWidget {
-                font-family: Consolas;
-            }
-        """)
-
-    def browse_export_path(self):
-        file_format = self.export_format.currentText()
-        file_filter = "CSV Files (*.csv)" if file_format == "CSV" else "Excel Files (*.xlsx)"
-        file_ext = ".csv" if file_format == "CSV" else ".xlsx"
-        
-        path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Save File",
-            "",
-            file_filter
-        )
-        if path:
-            if not path.endswith(file_ext):
-                path += file_ext
-            self.export_path.setText(path)
-
-    def update_summary(self):
-        if not self.freq_data is None and not self.s_parameters is None:
-            summary = []
-            summary.append("=== Data Summary ===\n")
-            
-            # Frequency range
-            summary.append(f"Frequency Range: {min(self.freq_data):.6f} GHz to {max(self.freq_data):.6f} GHz")
-            summary.append(f"Number of Frequency Points: {len(self.freq_data)}")
-            
-            # Parameters
-            if self.parameters and len(self.parameters) > 0:
-                summary.append(f"\nParameter Combinations: {len(self.parameters)}")
-                param_names = list(self.parameters[0].keys())
-                summary.append(f"Parameters: {', '.join(param_names)}")
-            
-            # Find minimum S11 in dB
-            min_s11_db = float('inf')
-            min_s11_freq = 0
-            min_s11_params = None
-            
-            for run_idx, s_param in enumerate(self.s_parameters):
-                for freq_idx, freq in enumerate(self.freq_data):
-                    s11_db = 20 * math.log10(abs(s_param[freq_idx]))
-                    if s11_db < min_s11_db:
-                        min_s11_db = s11_db
-                        min_s11_freq = freq
-                        min_s11_params = self.parameters[run_idx] if self.parameters else None
-            
-            summary.append(f"\nMinimum S11: {min_s11_db:.2f} dB at {min_s11_freq:.6f} GHz")
-            if min_s11_params:
-                params_str = ", ".join(f"{k}={v}" for k, v in min_s11_params.items())
-                summary.append(f"Parameters at minimum S11: {params_str}")
-            
-            self.summary_text.setText("\n".join(summary))
-
-    def exportData(self):
-        if self.full_data is None:
-            QtWidgets.QMessageBox.warning(self, "Error", "No data to export")
-            return
+# Command line names for the display modes and export formats
+CLI_DISPLAY_MODES = {
+    'complex': "Complex (Real + Imaginary)",
+    'magnitude': "Magnitude",
+    'db': "Magnitude (dB)",
+    'phase': "Magnitude and Phase",
+}
 
-        try:
-            # Get file path from user
-            file_format = self.export_format.currentText()
-            file_filter = "CSV Files (*.csv)" if file_format == "CSV" else "Excel Files (*.xlsx)"
-            file_ext = ".csv" if file_format == "CSV" else ".xlsx"
-            
-            export_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Export Data",
-                "",
-                file_filter
-            )
-            
-            if not export_path:
-                return
-                
-            if not export_path.endswith(file_ext):
-                export_path += file_ext
-
-            # Get selected columns
-            selected_columns = [col for col, checkbox in self.parameter_checkboxes.items() if checkbox.isChecked()]
-            
-            # Create DataFrame
-            data = []
-            frequencies = self.full_data['frequencies']
-            s_params = self.full_data['s_params']
-            
-            display_mode = self.display_mode.currentText()
-            
-            for run_idx, s_param in enumerate(s_params):
-                for freq_idx, freq in enumerate(frequencies):
-                    row_data = {}
-                    row_data["Frequency (GHz)"] = freq
-                    
-                    # Parameters
-                    if self.parameters:
-                        for param_name in self.parameters[0].keys():
-                            row_data[param_name] = self.parameters[run_idx][param_name]
-                    
-                    # S11 values
-                    s11 = s_param[freq_idx]
-                    if display_mode == "Complex (Real + Imaginary)":
-                        row_data["S11 Real"] = s11.real
-                        row_data["S11 Imaginary"] = s11.imag
-                    elif display_mode == "Magnitude":
-                        row_data["S11 Magnitude"] = abs(s11)
-                    elif display_mode == "Magnitude (dB)":
-                        row_data["S11 (dB)"] = 20 * math.log10(abs(s11))
-                    else:  # Magnitude and Phase
-                        row_data["S11 Magnitude"] = abs(s11)
-                        row_data["Phase (degrees)"] = math.degrees(math.atan2(s11.imag, s11.real))
-                    
-                    # Only include selected columns
-                    filtered_row = {col: row_data[col] for col in selected_columns if col in row_data}
-                    data.append(filtered_row)
-
-            df = pd.DataFrame(data)
-            
-            # Export based on selected format
-            if file_format == "CSV":
-                df.to_csv(export_path, index=False)
-            else:  # Excel
-                df.to_excel(export_path, index=False)
-            
-            QtWidgets.QMessageBox.information(self, "Success", f"Data exported to {export_path}")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to export data: {str(e)}")
-
-    def load_cst_data(self):
-        try:
-            import cst.results  # Import here to ensure it's available
-            project = cst.results.ProjectFile(self.filePathLineEdit.text(), allow_interactive=True)
-            s11_path = '1D Results\S-Parameters\S1,1'
-            s11 = project.get_3d().get_result_item(s11_path, 1)
-            self.freq_data = np.array(s11.get_xdata())
-            
-            # Update frequency range inputs
-            min_freq = float(np.min(self.freq_data))
-            max_freq = float(np.max(self.freq_data))
-            self.freq_start.setText(f"{min_freq:.6f}")
-            self.freq_end.setText(f"{max_freq:.6f}")
-
-            # Get all parameters and S11 data for each run
-            runids = project.get_3d().get_run_ids(s11_path)
-            self.s_parameters = []
-            self.parameters = []
-            
-            for run in runids:
-                s11_data = project.get_3d().get_result_item(s11_path, run)
-                self.s_parameters.append(np.array(s11_data.get_ydata()))
-                params = project.get_3d().get_parameter_combination(run)
-                self.parameters.append(params)
-
-            self.update_display()
-            self.update_summary()
-            QtWidgets.QMessageBox.information(self, "Success", "CST file loaded successfully")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load CST file: {str(e)}")
-
-    def toggle_freq_range(self, state):
-        self.freq_start.setEnabled(not state)
-        self.freq_end.setEnabled(not state)
-        self.apply_freq_range.setEnabled(not state)
-        self.update_display()
-
-    def create_header_checkboxes(self, columns):
-        # Clear existing header layout
-        while self.header_layout.count():
-            item = self.header_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        self.parameter_checkboxes = {}
-        
-        # Create a widget for each column with better styling
-        for col in columns:
-            container = QWidget()
-            container_layout = QHBoxLayout()
-            container_layout.setContentsMargins(5, 2, 5, 2)
-            container_layout.setSpacing(5)
-            
-            checkbox = QCheckBox()
-            checkbox.setChecked(True)
-            checkbox.setStyleSheet("""
-                QCheckBox {
-                    spacing: 5px;
-                }
-                QCheckBox::indicator {
-                    width: 15px;
-                    height: 15px;
-                }
-                QCheckBox::indicator:unchecked {
-                    border: 2px solid #999;
-                    background: white;
-                }
-                QCheckBox::indicator:checked {
-                    border: 2px solid #4CAF50;
-                    background: #4CAF50;
-                }
-            """)
-            
-            label = QLabel(col)
-            label.setStyleSheet("""
-                QLabel {
-                    color: #2c3e50;
-                    font-weight: bold;
-                    padding: 2px;
-                    background: #f8f9fa;
-                    border-radius: 3px;
-                }
-            """)
-            
-            container_layout.addWidget(checkbox)
-            container_layout.addWidget(label)
-            container_layout.addStretch()
-            
-            container.setLayout(container_layout)
-            container.setStyleSheet("""
-                QWidget {
-                    background: #f8f9fa;
-                    border-bottom: 1px solid #dee2e6;
-                }
-            """)
-            
-            self.header_layout.addWidget(container)
-            self.parameter_checkboxes[col] = checkbox
-        
-        # Style the table
-        self.tableWidget.setStyleSheet("""
-            QTableWidget {
-                gridline-color: #ddd;
-                selection-background-color: #e3f2fd;
-            }
-            QTableWidget::item {
-                padding: 5px;
-            }
-            QTableWidget::item:selected {
-                background-color: #e3f2fd;
-                color: black;
-            }
-            QHeaderView::section {
-                background-color: #f8f9fa;
-                padding: 5px;
-                border: 1px solid #dee2e6;
-                font-weight: bold;
-                color: #2c3e50;
-            }
-        """)
-        
-        # Hide default header and set alternating row colors
-        self.tableWidget.horizontalHeader().hide()
-        self.tableWidget.setAlternatingRowColors(True)
-        self.tableWidget.setStyleSheet(self.tableWidget.styleSheet() + """
-            QTableWidget {
-                alternate-background-color: #f8f9fa;
-                background-color: white;
-            }
-        """)
-        
-        # Set fixed column widths
-        header_width = 150  # Fixed width for each column
-        for i in range(len(columns)):
-            self.tableWidget.setColumnWidth(i, header_width)
-
-    def get_freq_range(self):
-        try:
-            if self.use_all_freq.isChecked():
-                return min(self.freq_data), max(self.freq_data)
-            else:
-                start = float(self.freq_start.text().replace(',', '.'))
-                end = float(self.freq_end.text().replace(',', '.'))
-                return start, end
-        except:
-            return min(self.freq_data), max(self.freq_data)
-
-    def update_display(self):
-        if self.freq_data is None or self.s_parameters is None:
-            return
+CLI_EXPORT_FORMATS = {
+    'csv': "CSV",
+    'excel': "Excel",
+    'parquet': "Parquet",
+    'feather': "Feather",
+    'hdf5': "HDF5",
+    'npz': "NumPy (NPZ)",
+    'touchstone': "Touchstone",
+    'touchstone-zip': "Touchstone (ZIP)",
+}
 
-        # Get frequency range
-        freq_start, freq_end = self.get_freq_range()
-        
-        # Convert frequency data to numpy array for comparison
-        freq_array = np.array(self.freq_data)
-        
-        # Filter frequencies based on range selection
-        freq_mask = (freq_array >= freq_start) & (freq_array <= freq_end)
-        frequencies = freq_array[freq_mask]
-        s_params = [s_param[freq_mask] for s_param in self.s_parameters]
-
-        # Store full dataset
-        self.full_data = {
-            'frequencies': frequencies,
-            's_params': s_params
-        }
+def job_store(job, config):
+    # SpillStore of config with the --memory-budget and --dtype overrides of a job
+    overrides = {key: job[key] for key in ('memory_budget_mb', 'spill_dtype') if job[key] is not None}
+    return SpillStore.from_config({**config, **overrides})
+
+def convert_project(job):
+    # Loads, filters and exports one project. Runs in a worker process of run_batch,
+    # so it only takes and returns plain picklable values.
+    result = {'project': job['project'], 'output': None, 'runs': 0, 'rows': 0,
+              'load_time': 0.0, 'export_time': 0.0, 'error': None}
+    try:
+        add_cst_library_path(job['cst_library_path'])
+        config = load_config()
+        cache = ResultCache.from_config(config) if job['use_cache'] else None
+
+        start = time.perf_counter()
+        sweep = load_cst_items(job['project'], job['result_paths'], cache=cache, run_filter=job['run_filter'],
+                               max_workers=config.get('load_workers', DEFAULT_LOAD_WORKERS),
+                               store=job_store(job, config), frequency_grid=job['frequency_grid'])
+        sweep = sweep.select_frequency_range(job['freq_start'], job['freq_end'])
+        result['load_time'] = time.perf_counter() - start
+
+        output_dir = job['output_dir'] or os.path.dirname(os.path.abspath(job['project']))
+        output = compressed_path(os.path.join(output_dir, job['output_stem'] + EXPORT_FORMATS[job['file_format']]),
+                                 job['compression'])
+
+        start = time.perf_counter()
+        write_export(output, job['file_format'], sweep, job['display_mode'], job['columns'],
+                     excel_sheet_per_run=job['excel_sheet_per_run'], layout=job['layout'],
+                     workers=job['export_workers'], precision=job['precision'],
+                     compression=job['compression'], compression_level=job['compression_level'])
+        result['export_time'] = time.perf_counter() - start
+
+        result['output'] = output
+        result['runs'] = sweep.n_runs
+        result['rows'] = sweep.n_runs * sweep.n_freq
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def merge_batch(output, jobs, workers):
+    # --merge: every job's project in one export, loaded on a thread per project
+    job = jobs[0]
+    try:
+        add_cst_library_path(job['cst_library_path'])
+        config = load_config()
+        cache = ResultCache.from_config(config) if job['use_cache'] else None
+
+        start = time.perf_counter()
+        merged = load_projects([job['project'] for job in jobs], job['result_paths'], cache=cache,
+                               concurrency=workers, run_filter=job['run_filter'], max_workers=config.get('load_workers', DEFAULT_LOAD_WORKERS),
+                               store=job_store(job, config), frequency_grid=job['frequency_grid'])
+        merged = merged.select_frequency_range(job['freq_start'], job['freq_end'])
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output = compressed_path(output, job['compression'])
+        write_export(output, job['file_format'], merged, job['display_mode'], job['columns'],
+                     excel_sheet_per_run=job['excel_sheet_per_run'], layout=job['layout'],
+                     precision=job['precision'], compression=job['compression'],
+                     compression_level=job['compression_level'])
+        export_time = time.perf_counter() - start
+    except Exception as e:
+        print(f"FAILED {output}: {str(e)}", file=sys.stderr)
+        return 1
+
+    rows = sum(sweep.n_runs * sweep.n_freq for sweep in merged.projects.values())
+    print(f"Merged {len(jobs)} projects: {merged.n_runs} runs, {rows} rows, "
+          f"load {load_time:.2f} s, export {export_time:.2f} s -> {output}")
+    return 0
+
+def expand_projects(patterns):
+    projects = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        projects.extend(match for match in matches if match not in projects)
+    return projects
+
+def output_stems(projects, shared_dir):
+    # Output file names (without extension) of the projects: their stems, or, when the
+    # outputs share one directory, the parent folder and stem of projects whose stems
+    # clash (plus a counter if those clash too)
+    stems = [os.path.splitext(os.path.basename(project))[0] for project in projects]
+    if not shared_dir:
+        return stems
+    clashing = {stem.lower() for stem in stems if sum(other.lower() == stem.lower() for other in stems) > 1}
+    names = []
+    for project, stem in zip(projects, stems):
+        if stem.lower() in clashing:
+            stem = f"{os.path.basename(os.path.dirname(os.path.abspath(project)))}_{stem}"
+        name, count = stem, 1
+        while name.lower() in (other.lower() for other in names):
+            count += 1
+            name = f"{stem}_{count}"
+        names.append(name)
+    return names
+
+def run_batch(argv):
+    parser = argparse.ArgumentParser(
+        prog='cst2csv',
+        description="Convert the S-parameter results of CST projects without starting the GUI.")
+    parser.add_argument('projects', nargs='+', help=".cst files or glob patterns")
+    parser.add_argument('--mode', choices=CLI_DISPLAY_MODES, default='complex',
+                        help="display mode (default: complex)")
+    parser.add_argument('--item', dest='items', action='append',
+                        help="S-parameter item to export, e.g. S2,1 or S21; repeat for several (default: S1,1)")
+    parser.add_argument('--format', dest='file_format', choices=CLI_EXPORT_FORMATS, default='csv',
+                        help="output format (default: csv)")
+    parser.add_argument('--freq-start', type=float, help="start frequency in GHz")
+    parser.add_argument('--freq-end', type=float, help="end frequency in GHz")
+    parser.add_argument('--filter', dest='run_filter', metavar='EXPR',
+                        help="only load runs whose sweep parameters match, e.g. \"L in [10, 12] and W == 3\"")
+    parser.add_argument('--columns', help="comma separated list of columns to export (default: all)")
+    parser.add_argument('--grid', choices=['linear', 'reference', 'union'],
+                        help="common frequency grid runs on different frequency axes (adaptive sweeps) are "
+                             "resampled onto: --grid-points evenly spaced points, the axis of --grid-run, or the "
+                             "union of all axes (at most %d points). Given explicitly, a linear grid resamples "
+                             "every sweep (default: linear, for runs on different axes only)" % MAX_UNION_GRID_POINTS)
+    parser.add_argument('--grid-run', type=int, metavar='ID', help="with --grid reference, the run ID (default: first run)")
+    parser.add_argument('--grid-points', type=int, metavar='N',
+                        help="with --grid linear, the number of points (default: as many as the longest run)")
+    parser.add_argument('--grid-start', type=float, help="with --grid linear, start frequency in GHz (default: common range)")
+    parser.add_argument('--grid-end', type=float, help="with --grid linear, end frequency in GHz (default: common range)")
+    parser.add_argument('--layout', choices=['long', 'wide'], default='long',
+                        help="long: one row per run and frequency; wide: one row per frequency and one "
+                             "column per run, parameters in a sidecar table (default: long)")
+    parser.add_argument('--excel-sheet-per-run', action='store_true',
+                        help="with --format excel, write one sheet per parameter combination")
+    parser.add_argument('--freq-digits', type=int, metavar='N',
+                        help="significant digits of the frequency in text exports (default: full precision)")
+    parser.add_argument('--param-digits', type=int, metavar='N',
+                        help="significant digits of the sweep parameters in text exports (default: full precision)")
+    parser.add_argument('--value-digits', type=int, metavar='N',
+                        help="significant digits of the S-parameter values in text exports (default: full precision)")
+    parser.add_argument('--compress', choices=list(COMPRESSIONS),
+                        help="with --format csv, compress the output while it is written")
+    parser.add_argument('--compress-level', type=int, metavar='N',
+                        help="compression level (default: gzip 6, xz 1, zstd 3)")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help="memory for loaded S-parameters per worker process; larger sweeps are memory-mapped "
+                             "to temporary files (default: memory_budget_mb in config.json, or 8192)")
+    parser.add_argument('--dtype', choices=list(SPILL_DTYPES),
+                        help="element type S-parameters are stored with (default: spill_dtype in config.json, "
+                             "or complex128)")
+    parser.add_argument('--output-dir', help="output directory (default: next to each project); projects with the "
+                                             "same name in different folders are written as <folder>_<name>")
+    parser.add_argument('--merge', metavar='FILE',
+                        help="load all projects concurrently and export them to one file with a Project column")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of projects converted in parallel")
+    parser.add_argument('--cst-lib', help="CST Python library path (default: from config.json)")
+    parser.add_argument('--no-cache', action='store_true', help="always read results from the project")
+    args = parser.parse_args(argv)
+
+    projects = expand_projects(args.projects)
+    if not projects:
+        parser.error("no projects matched")
+    if args.compress and args.file_format != 'csv':
+        parser.error("--compress needs --format csv")
+    if args.compress and args.compress not in available_compressions():
+        parser.error(f"{args.compress} compression needs the {COMPRESSION_MODULES[args.compress]} package")
+    for digits in (args.freq_digits, args.param_digits, args.value_digits):
+        if digits is not None and not 1 <= digits <= 17:
+            parser.error("digits must be between 1 and 17")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
 
-        # Limit display data
-        display_step = max(1, len(frequencies) // self.MAX_DISPLAY_ROWS)
-        frequencies = frequencies[::display_step]
-        s_params = [s_param[::display_step] for s_param in s_params]
-
-        # Create headers based on display mode and parameters
-        param_headers = []
-        if self.parameters and len(self.parameters) > 0:
-            param_headers = list(self.parameters[0].keys())
-
-        display_mode = self.display_mode.currentText()
-        if display_mode == "Complex (Real + Imaginary)":
-            value_headers = ["S11 Real", "S11 Imaginary"]
-        elif display_mode == "Magnitude":
-            value_headers = ["S11 Magnitude"]
-        elif display_mode == "Magnitude (dB)":
-            value_headers = ["S11 (dB)"]
-        else:  # Magnitude and Phase
-            value_headers = ["S11 Magnitude", "Phase (degrees)"]
-
-        headers = ["Frequency (GHz)"] + param_headers + value_headers
-        self.create_header_checkboxes(headers)
-
-        # Prepare table
-        self.tableWidget.setRowCount(len(frequencies) * len(s_params))
-        self.tableWidget.setColumnCount(len(headers))
-
-        # Fill table with data
-        row = 0
-        for run_idx, s_param in enumerate(s_params):
-            for freq_idx, freq in enumerate(frequencies):
-                col = 0
-                # Frequency
-                self.tableWidget.setItem(row, col, QTableWidgetItem(f"{freq:.6f}"))
-                col += 1
-
-                # Parameters
-                if self.parameters:
-                    for param_name in param_headers:
-                        param_value = self.parameters[run_idx][param_name]
-                        self.tableWidget.setItem(row, col, QTableWidgetItem(str(param_value)))
-                        col += 1
-
-                # S11 values based on display mode
-                s11 = s_param[freq_idx]
-                if display_mode == "Complex (Real + Imaginary)":
-                    self.tableWidget.setItem(row, col, QTableWidgetItem(f"{s11.real:.6f}"))
-                    self.tableWidget.setItem(row, col + 1, QTableWidgetItem(f"{s11.imag:.6f}"))
-                elif display_mode == "Magnitude":
-                    magnitude = abs(s11)
-                    self.tableWidget.setItem(row, col, QTableWidgetItem(f"{magnitude:.6f}"))
-                elif display_mode == "Magnitude (dB)":
-                    magnitude_db = 20 * math.log10(abs(s11))
-                    self.tableWidget.setItem(row, col, QTableWidgetItem(f"{magnitude_db:.6f}"))
-                else:  # Magnitude and Phase
-                    magnitude = abs(s11)
-                    phase = math.degrees(math.atan2(s11.imag, s11.real))
-                    self.tableWidget.setItem(row, col, QTableWidgetItem(f"{magnitude:.6f}"))
-                    self.tableWidget.setItem(row, col + 1, QTableWidgetItem(f"{phase:.6f}"))
-                row += 1
-
-    def browseFile(self):
-        filePath, _ = QFileDialog.getOpenFileName(self, "Select CST File", "", "CST Files (*.cst);;All Files (*)")
-        if filePath:
-            self.filePathLineEdit.setText(filePath)
-            self.load_cst_data()
-
-    def change_library_path(self):
-        if setup_cst_path(self):
-            QtWidgets.QMessageBox.information(self, "Success", 
-                "CST Library path updated successfully.\nPlease restart the application for changes to take effect.")
+    frequency_grid = None
+    if args.grid == 'reference':
+        frequency_grid = ("Reference Run", args.grid_run)
+    elif args.grid == 'union':
+        frequency_grid = ("Union",)
+    elif args.grid == 'linear':
+        frequency_grid = ("Linear", args.grid_start, args.grid_end, args.grid_points)
+
+    cst_library_path = args.cst_lib or load_config().get('cst_library_path')
+    columns = [col.strip() for col in args.columns.split(',')] if args.columns else None
+    jobs = [{
+        'project': project,
+        'output_stem': stem,
+        'cst_library_path': cst_library_path,
+        'result_paths': [sparameter_result_path(item) for item in args.items or ['S1,1']],
+        'display_mode': CLI_DISPLAY_MODES[args.mode],
+        'file_format': CLI_EXPORT_FORMATS[args.file_format],
+        'freq_start': args.freq_start,
+        'freq_end': args.freq_end,
+        'columns': columns,
+        'output_dir': args.output_dir,
+        'excel_sheet_per_run': args.excel_sheet_per_run,
+        'layout': args.layout.capitalize(),
+        'run_filter': args.run_filter,
+        'frequency_grid': frequency_grid,
+        # Touchstone's process pool only gets the machine to itself for a single project
+        'export_workers': 1 if len(projects) > 1 else None,
+        'precision': {'frequency': args.freq_digits, 'parameters': args.param_digits, 'values': args.value_digits},
+        'compression': args.compress,
+        'compression_level': args.compress_level,
+        'memory_budget_mb': args.memory_budget,
+        'spill_dtype': args.dtype,
+        'use_cache': not args.no_cache,
+    } for project, stem in zip(projects, output_stems(projects, args.output_dir))]
+
+    if args.merge:
+        return merge_batch(args.merge, jobs, args.workers)
+
+    start = time.perf_counter()
+    failed = 0
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as pool:
+        for result in pool.map(convert_project, jobs):
+            if result['error']:
+                failed += 1
+                print(f"FAILED {result['project']}: {result['error']}", file=sys.stderr)
+                continue
+            total_rows += result['rows']
+            print(f"{result['project']}: {result['runs']} runs, {result['rows']} rows, "
+                  f"load {result['load_time']:.2f} s, export {result['export_time']:.2f} s "
+                  f"-> {result['output']}")
+    elapsed = time.perf_counter() - start
+
+    converted = len(jobs) - failed
+    print(f"Converted {converted}/{len(jobs)} projects, {total_rows} rows in {elapsed:.2f} s "
+          f"({converted / elapsed:.2f} projects/s, {total_rows / elapsed:.0f} rows/s)")
+    return 1 if failed else 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_batch(argv)
+
+    # The GUI (and PyQt5) is only imported when no command line arguments are given. Run
+    # as a script this module is __main__; registering it as cst2csv keeps the GUI's
+    # import from loading it a second time (and restarting STARTUP_START).
+    sys.modules.setdefault('cst2csv', sys.modules[__name__])
+    from cst2csv_gui import run_gui
+    return run_gui()
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    if setup_cst_path():
-        mainWin = CSTExportApp()
-        mainWin.show()
-        sys.exit(app.exec_())
-    else:
-        sys.exit(1)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('config.json', '.')],
-    hiddenimports=['PyQt5', 'pandas', 'numpy', 'openpyxl', 'json'],
+    hiddenimports=['cst2csv_gui', 'PyQt5', 'pandas', 'numpy', 'openpyxl', 'json'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
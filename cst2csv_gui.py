@@ -0,0 +1,1468 @@
+import sys
+import os
+import threading
+import time
+import numpy as np
+from PyQt5 import QtWidgets, QtGui
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, 
+                           QVBoxLayout, QCheckBox, QLineEdit, 
+                           QWidget, QSpinBox, QScrollArea, QGroupBox, QHBoxLayout, QDoubleSpinBox,
+                           QComboBox, QTabWidget, QTextEdit, QDialog, QProgressDialog, QTableView,
+                           QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QProgressBar)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, pyqtSignal
+from cst2csv import (load_config, save_config, check_cst_library_path, add_cst_library_path,
+                     value_columns, compute_value_column, compute_summary, append_summary, preview_indices,
+                     run_export_job, load_cst_runs, load_cst_items, load_sweep_item, block_rows, TABLE_BLOCK_BYTES,
+                     fetch_new_runs, list_sparameter_items, sparameter_label, sparameter_result_path,
+                     SweepData, ProjectSweeps, project_names, parameter_sidecar_path, ResultCache, SpillStore,
+                     DerivedCache, LoadCancelled, available_export_formats, FREQUENCY_COLUMN, PROJECT_COLUMN,
+                     available_compressions, compressed_path, COMPRESSIONS, FREQUENCY_GRIDS,
+                     DEFAULT_FREQUENCY_GRID, MAX_UNION_GRID_POINTS,
+                     EXPORT_FORMATS, EXPORT_LAYOUTS, EXPORT_FILE_FILTERS, BANDWIDTH_THRESHOLD_DB,
+                     DEFAULT_LOAD_WORKERS, DEFAULT_WATCH_INTERVAL_S, DEFAULT_EXPORT_QUEUE_WORKERS,
+                     S11_RESULT_PATH, perf_recorder,
+                     STARTUP_START)
+
+class LibraryPathDialog(QDialog):
+    def __init__(self, parent=None, current_path=None):
+        super().__init__(parent)
+        self.setWindowTitle("CST Library Path Configuration")
+        self.setModal(True)
+        
+        layout = QVBoxLayout(self)
+        
+        # Path input
+        path_group = QGroupBox("CST Python Library Path")
+        path_layout = QHBoxLayout()
+        
+        self.path_input = QLineEdit(current_path if current_path else "")
+        self.browse_btn = QPushButton("Browse")
+        self.browse_btn.clicked.connect(self.browse_path)
+        
+        path_layout.addWidget(self.path_input)
+        path_layout.addWidget(self.browse_btn)
+        path_group.setLayout(path_layout)
+        layout.addWidget(path_group)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.save_btn = QPushButton("Save")
+        self.save_btn.clicked.connect(self.accept)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        
+        button_layout.addWidget(self.save_btn)
+        button_layout.addWidget(self.cancel_btn)
+        layout.addLayout(button_layout)
+        
+        self.setStyleSheet("""
+            QPushButton {
+                background-color: #4CAF50;
+                color: white;
+                border: none;
+                padding: 5px 15px;
+                border-radius: 3px;
+            }
+            QPushButton:hover {
+                background-color: #45a049;
+            }
+            QLineEdit {
+                padding: 5px;
+                border: 1px solid #ddd;
+                border-radius: 3px;
+            }
+        """)
+    
+    def browse_path(self):
+        path = QFileDialog.getExistingDirectory(self, "Select CST Python Libraries Directory")
+        if path:
+            self.path_input.setText(path)
+    
+    def get_path(self):
+        return self.path_input.text()
+
+def setup_cst_path(parent=None):
+    # The stored library path only goes through the cached check_cst_library_path and is
+    # added to sys.path; cst.results itself is imported when the first project is loaded
+    config = load_config()
+    current_path = config.get('cst_library_path')
+    if check_cst_library_path(config):
+        add_cst_library_path(current_path)
+        return True
+
+    # Show dialog if no path or invalid path
+    dialog = LibraryPathDialog(parent, current_path)
+    if dialog.exec_() == QDialog.Accepted:
+        config['cst_library_path'] = dialog.get_path()
+        if check_cst_library_path(config):
+            save_config(config)
+            add_cst_library_path(config['cst_library_path'])
+            return True
+        QtWidgets.QMessageBox.critical(parent, "Error", 
+            "Could not find CST Python libraries in the selected path.\n"
+            "Please make sure you select the correct directory containing 'cst' module.")
+        return setup_cst_path(parent)  # Try again
+    return False
+
+class CSTLoadWorker(QThread):
+    progress = pyqtSignal(int, int)
+    items_found = pyqtSignal(list)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    # With discover set, the project's S-parameter items are listed first (items_found)
+    # and S1,1, or the first item if there is no S1,1, is loaded. With a run_filter only
+    # the matching runs are loaded. With a sweep, result_path is loaded as a further item
+    # of it, on its runs and frequency axis.
+    def __init__(self, project_path, result_path=S11_RESULT_PATH, max_workers=DEFAULT_LOAD_WORKERS,
+                 cache=None, discover=False, run_filter=None, store=None, frequency_grid=None, sweep=None,
+                 parent=None):
+        super().__init__(parent)
+        self.project_path = project_path
+        self.result_path = result_path
+        self.discover = discover
+        self.max_workers = max_workers
+        self.cache = cache
+        self.run_filter = run_filter
+        self.store = store
+        self.frequency_grid = frequency_grid
+        self.sweep = sweep
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            if self.discover:
+                items = list_sparameter_items(self.project_path)
+                self.items_found.emit(items)
+                if items and self.result_path not in items:
+                    self.result_path = items[0]
+            if self.sweep is not None:
+                result = load_sweep_item(self.project_path, self.result_path, self.sweep, cache=self.cache,
+                                         max_workers=self.max_workers, progress_callback=self.progress.emit,
+                                         cancel_event=self.cancel_event, store=self.store,
+                                         frequency_grid=self.frequency_grid)
+            else:
+                result = load_cst_runs(self.project_path,
+                                       self.result_path,
+                                       cache=self.cache,
+                                       run_filter=self.run_filter,
+                                       max_workers=self.max_workers,
+                                       progress_callback=self.progress.emit,
+                                       cancel_event=self.cancel_event,
+                                       store=self.store,
+                                       frequency_grid=self.frequency_grid)
+        except LoadCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(result)
+
+class CSTProjectWorker(QThread):
+    loaded = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+    # Loads the given result paths of an additional project; one worker runs per project.
+    # With a sweep (the project loaded earlier), they are loaded as further items of it.
+    def __init__(self, project_path, result_paths, max_workers=DEFAULT_LOAD_WORKERS, cache=None,
+                 run_filter=None, store=None, frequency_grid=None, sweep=None, parent=None):
+        super().__init__(parent)
+        self.project_path = project_path
+        self.result_paths = result_paths
+        self.max_workers = max_workers
+        self.cache = cache
+        self.run_filter = run_filter
+        self.store = store
+        self.frequency_grid = frequency_grid
+        self.sweep = sweep
+
+    def run(self):
+        try:
+            if self.sweep is not None:
+                result = self.sweep
+                for result_path in self.result_paths:
+                    result = result.with_items(load_sweep_item(self.project_path, result_path, self.sweep,
+                                                               cache=self.cache, max_workers=self.max_workers,
+                                                               store=self.store, frequency_grid=self.frequency_grid))
+            else:
+                result = load_cst_items(self.project_path, self.result_paths, cache=self.cache,
+                                        run_filter=self.run_filter, max_workers=self.max_workers, store=self.store,
+                                        frequency_grid=self.frequency_grid)
+        except Exception as e:
+            self.failed.emit(self.project_path, str(e))
+        else:
+            self.loaded.emit(self.project_path, result)
+
+class CSTWatchWorker(QThread):
+    loaded = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    # Reads the runs of the project that are not in sweep yet. loaded carries the sweep
+    # the new runs belong to and the new runs, or None if there were none.
+    def __init__(self, project_path, sweep, max_workers=DEFAULT_LOAD_WORKERS, run_filter=None, parent=None):
+        super().__init__(parent)
+        self.project_path = project_path
+        self.sweep = sweep
+        self.max_workers = max_workers
+        self.run_filter = run_filter
+
+    def run(self):
+        try:
+            result_paths = [sparameter_result_path(label) for label in self.sweep.labels]
+            result = fetch_new_runs(self.project_path, self.sweep, result_paths, run_filter=self.run_filter,
+                                    max_workers=self.max_workers)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(self.sweep, result)
+
+class ExportWorker(QThread):
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    # Runs one export job (run_export_job) off the GUI thread. cancel() stops it at the
+    # next block of the export; completed then carries False.
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        def report(done, total):
+            self.progress.emit(done, total)
+            return not self.cancel_event.is_set()
+
+        try:
+            completed = run_export_job(self.job, report)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.completed.emit(completed)
+
+class ResultsTableModel(QAbstractTableModel):
+    # Long-format view (one row per run and frequency) over the loaded arrays. Cells are
+    # formatted only when the view asks for them, so no per-cell objects are allocated.
+    # Values are derived from the items only for the block of runs the view is showing
+    # (TABLE_BLOCK_BYTES of S-parameters per item), so a refresh never derives or pages
+    # in a whole spilled matrix.
+    # With preview_points, each run shows a peak-preserving selection of at most that many
+    # frequency points (preview_indices on the magnitude of the first item).
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sweep = SweepData(np.empty(0), {})
+        self.headers = []
+        self.columns = {}  # column name -> (label, quantity)
+        self.block = None  # (first run, last run + 1, {column name: values of those runs})
+        self.preview = None
+
+    def set_data(self, sweep, display_mode, preview_points=0):
+        self.beginResetModel()
+        self.sweep = sweep
+        self.columns = {name: (label, quantity) for name, label, quantity in value_columns(display_mode, sweep.labels)}
+        self.headers = [FREQUENCY_COLUMN] + sweep.param_names + list(self.columns)
+        self.block = None
+        self.preview = None
+        if preview_points and sweep.labels:
+            self.preview = preview_indices(sweep.items[sweep.labels[0]], preview_points)
+        self.endResetModel()
+
+    def points_per_run(self):
+        return self.sweep.n_freq if self.preview is None else self.preview.shape[1]
+
+    def block_values(self, run_idx):
+        if self.block is None or not self.block[0] <= run_idx < self.block[1]:
+            step = block_rows(self.sweep.s_params, TABLE_BLOCK_BYTES)
+            start = run_idx - run_idx % step
+            stop = min(start + step, self.sweep.n_runs)
+            self.block = (start, stop, {name: compute_value_column(self.sweep.items[label][start:stop], quantity)
+                                        for name, (label, quantity) in self.columns.items()})
+        return self.block[2]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.sweep.n_runs * self.points_per_run()
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        run_idx, freq_idx = divmod(index.row(), self.points_per_run())
+        if self.preview is not None:
+            freq_idx = self.preview[run_idx, freq_idx]
+        column = self.headers[index.column()]
+        if column == FREQUENCY_COLUMN:
+            return f"{self.sweep.frequencies[freq_idx]:.6f}"
+        if column in self.sweep.param_values:
+            return str(self.sweep.param_values[column][run_idx])
+        return f"{self.block_values(run_idx)[column][run_idx - self.block[0], freq_idx]:.6f}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+class CSTExportApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.parameter_checkboxes = {}
+        self.sweep = None
+        self.view = None
+        self.load_worker = None
+        self.load_progress = None
+        self.sparameter_paths = {}
+        self.export_jobs = []  # {'worker', 'row', 'state'} per submitted export
+        self.summary_stats = None
+        self.summary_rows = []  # per-run lines of the summary
+        self.pending_cache = None  # (project path, frequency grid) of runs appended since the last cache write
+        # Shared by every load, so the memory budget covers all loaded sweeps
+        self.spill_store = SpillStore.from_config(load_config())
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle("CST to CSV Export Tool")
+        self.setGeometry(100, 100, 1200, 800)
+
+        # Create menu bar
+        menubar = self.menuBar()
+        settings_menu = menubar.addMenu('Settings')
+        
+        # Add CST Library Path action
+        change_path_action = settings_menu.addAction('Change CST Library Path')
+        change_path_action.triggered.connect(self.change_library_path)
+        
+        # Add Clear Cache action
+        clear_cache_action = settings_menu.addAction('Clear Result Cache')
+        clear_cache_action.triggered.connect(self.clear_result_cache)
+        
+        # Add Performance Monitoring toggle
+        self.perf_action = settings_menu.addAction('Performance Monitoring')
+        self.perf_action.setCheckable(True)
+        self.perf_action.setChecked(perf_recorder.enabled)
+        self.perf_action.toggled.connect(self.toggle_performance_monitoring)
+        
+        # Add single precision storage toggle
+        self.complex64_action = settings_menu.addAction('Store S-Parameters in Single Precision')
+        self.complex64_action.setCheckable(True)
+        self.complex64_action.setChecked(self.spill_store.dtype == np.complex64)
+        self.complex64_action.setToolTip("Halves the memory of loaded sweeps; applies to the next load")
+        self.complex64_action.toggled.connect(self.toggle_single_precision)
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+
+        # Set application icon
+        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_icon.svg')
+        self.setWindowIcon(QtGui.QIcon(icon_path))
+
+        # File selection section
+        file_group = QGroupBox("File Selection")
+        file_layout = QHBoxLayout()
+        self.filePathLineEdit = QLineEdit()
+        self.browseButton = QPushButton("Browse")
+        self.browseButton.clicked.connect(self.browseFile)
+        file_layout.addWidget(self.filePathLineEdit)
+        file_layout.addWidget(self.browseButton)
+        
+        # Further projects are loaded concurrently and exported together with this one
+        self.addProjectsButton = QPushButton("Add Projects...")
+        self.addProjectsButton.clicked.connect(self.add_projects)
+        file_layout.addWidget(self.addProjectsButton)
+        self.projects_status = QLabel()
+        file_layout.addWidget(self.projects_status)
+        self.extra_projects = {}  # path -> SweepData
+        self.project_workers = []
+        
+        # Watch mode polls the project for runs added by a running sweep
+        self.watch_checkbox = QCheckBox("Watch for new runs")
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        file_layout.addWidget(self.watch_checkbox)
+        self.watch_status = QLabel()
+        file_layout.addWidget(self.watch_status)
+        self.watch_worker = None
+        self.watch_timer = QTimer(self)
+        self.watch_timer.timeout.connect(self.check_new_runs)
+        file_group.setLayout(file_layout)
+        main_layout.addWidget(file_group)
+
+        # Create tab widget
+        self.tab_widget = QTabWidget()
+        main_layout.addWidget(self.tab_widget)
+
+        # Data tab
+        data_tab = QWidget()
+        data_layout = QVBoxLayout(data_tab)
+
+        # S-Parameter Display Options
+        display_group = QGroupBox("S-Parameter Display Options")
+        display_layout = QHBoxLayout()
+        
+        # Items are loaded from the project the first time they are checked
+        self.sparameter_list = QListWidget()
+        self.sparameter_list.setFlow(QListWidget.LeftToRight)
+        self.sparameter_list.setWrapping(True)
+        self.sparameter_list.setMaximumHeight(70)
+        self.sparameter_list.itemChanged.connect(self.on_sparameter_toggled)
+        display_layout.addWidget(QLabel("S-Parameters:"))
+        display_layout.addWidget(self.sparameter_list)
+        
+        self.display_mode = QComboBox()
+        self.display_mode.addItems([
+            "Complex (Real + Imaginary)",
+            "Magnitude",
+            "Magnitude (dB)",
+            "Magnitude and Phase"
+        ])
+        self.display_mode.currentIndexChanged.connect(self.update_display)
+        display_layout.addWidget(self.display_mode)
+        display_group.setLayout(display_layout)
+        data_layout.addWidget(display_group)
+
+        # Frequency range selection
+        freq_group = QGroupBox("Frequency Range Selection")
+        freq_layout = QHBoxLayout()
+        
+        self.freq_start = QLineEdit()
+        self.freq_start.setPlaceholderText("Start Frequency (GHz)")
+        
+        self.freq_end = QLineEdit()
+        self.freq_end.setPlaceholderText("End Frequency (GHz)")
+        
+        freq_layout.addWidget(QLabel("Start Frequency:"))
+        freq_layout.addWidget(self.freq_start)
+        freq_layout.addWidget(QLabel("End Frequency:"))
+        freq_layout.addWidget(self.freq_end)
+        
+        self.use_all_freq = QCheckBox("Use All Frequencies")
+        self.use_all_freq.setChecked(True)
+        self.use_all_freq.stateChanged.connect(self.toggle_freq_range)
+        freq_layout.addWidget(self.use_all_freq)
+        
+        self.apply_freq_range = QPushButton("Apply Range")
+        self.apply_freq_range.clicked.connect(self.update_display)
+        freq_layout.addWidget(self.apply_freq_range)
+        
+        freq_group.setLayout(freq_layout)
+        data_layout.addWidget(freq_group)
+
+        # Run filter on the sweep parameters, applied when the project is loaded
+        filter_group = QGroupBox("Run Filter")
+        filter_layout = QHBoxLayout()
+        self.run_filter = None
+        self.run_filter_edit = QLineEdit()
+        self.run_filter_edit.setPlaceholderText("e.g. L in [10, 12] and W == 3, or 10 <= L <= 12 (empty: all runs)")
+        self.run_filter_edit.returnPressed.connect(self.apply_run_filter)
+        filter_layout.addWidget(self.run_filter_edit)
+        self.apply_filter_button = QPushButton("Apply Filter")
+        self.apply_filter_button.clicked.connect(self.apply_run_filter)
+        filter_layout.addWidget(self.apply_filter_button)
+        self.run_filter_status = QLabel()
+        filter_layout.addWidget(self.run_filter_status)
+        filter_group.setLayout(filter_layout)
+        data_layout.addWidget(filter_group)
+
+        # Common frequency grid for runs on different frequency axes (adaptive sweeps)
+        grid_group = QGroupBox("Frequency Grid")
+        grid_layout = QHBoxLayout()
+        self.frequency_grid = None
+        grid_layout.addWidget(QLabel("Runs on different axes are resampled onto:"))
+        self.grid_mode = QComboBox()
+        self.grid_mode.addItems(FREQUENCY_GRIDS)
+        self.grid_mode.setToolTip("Linear: evenly spaced points; with a start, stop or number of points it\n"
+                                  "is applied to every sweep\n"
+                                  "Reference Run: the frequencies of one run\n"
+                                  f"Union: every frequency any run has (at most {MAX_UNION_GRID_POINTS} points)")
+        grid_layout.addWidget(self.grid_mode)
+        grid_layout.addWidget(QLabel("Run:"))
+        self.grid_run = QSpinBox()
+        self.grid_run.setRange(0, 1000000)
+        self.grid_run.setSpecialValueText("First")
+        grid_layout.addWidget(self.grid_run)
+        grid_layout.addWidget(QLabel("Start:"))
+        self.grid_start = QLineEdit()
+        self.grid_start.setPlaceholderText("common range")
+        grid_layout.addWidget(self.grid_start)
+        grid_layout.addWidget(QLabel("Stop:"))
+        self.grid_end = QLineEdit()
+        self.grid_end.setPlaceholderText("common range")
+        grid_layout.addWidget(self.grid_end)
+        grid_layout.addWidget(QLabel("Points:"))
+        self.grid_points = QSpinBox()
+        self.grid_points.setRange(0, 10000000)
+        self.grid_points.setSpecialValueText("Longest Run")
+        grid_layout.addWidget(self.grid_points)
+        self.apply_grid_button = QPushButton("Apply Grid")
+        self.apply_grid_button.clicked.connect(self.apply_frequency_grid)
+        grid_layout.addWidget(self.apply_grid_button)
+        self.grid_mode.currentTextChanged.connect(self.update_grid_options)
+        self.update_grid_options(self.grid_mode.currentText())
+        grid_group.setLayout(grid_layout)
+        data_layout.addWidget(grid_group)
+
+        # Results table with header checkboxes
+        table_group = QGroupBox("Results")
+        table_layout = QVBoxLayout()
+        
+        self.header_widget = QWidget()
+        self.header_layout = QHBoxLayout()
+        self.header_layout.setSpacing(0)
+        self.header_layout.setContentsMargins(0, 0, 0, 0)
+        self.header_widget.setLayout(self.header_layout)
+        table_layout.addWidget(self.header_widget)
+        
+        preview_layout = QHBoxLayout()
+        preview_layout.addWidget(QLabel("Preview points per run:"))
+        self.preview_points = QSpinBox()
+        self.preview_points.setRange(0, 1000000)
+        self.preview_points.setSingleStep(500)
+        self.preview_points.setSpecialValueText("All")
+        self.preview_points.setValue(int(load_config().get('preview_points', 0)))
+        self.preview_points.setToolTip("Bounds the table to this many points per run, keeping the minimum and "
+                                       "maximum |S| of every frequency bucket so resonances are never skipped. "
+                                       "Exports always contain every point.")
+        self.preview_points.editingFinished.connect(self.update_display)
+        preview_layout.addWidget(self.preview_points)
+        preview_layout.addStretch()
+        table_layout.addLayout(preview_layout)
+        
+        self.results_model = ResultsTableModel(self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.results_model)
+        self.tableView.setMinimumHeight(400)
+        table_layout.addWidget(self.tableView)
+        
+        table_group.setLayout(table_layout)
+        data_layout.addWidget(table_group)
+
+        # Export section
+        export_group = QGroupBox("Export Options")
+        export_group_layout = QVBoxLayout()
+        export_layout = QHBoxLayout()
+        
+        # File format selection
+        export_layout.addWidget(QLabel("Export Format:"))
+        self.export_format = QComboBox()
+        self.export_format.addItems(available_export_formats())
+        self.export_format.currentTextChanged.connect(self.update_text_export_options)
+        export_layout.addWidget(self.export_format)
+        
+        self.stream_export = QCheckBox("Stream to file (low memory)")
+        self.stream_export.setChecked(True)
+        export_layout.addWidget(self.stream_export)
+        
+        export_layout.addWidget(QLabel("Layout:"))
+        self.export_layout = QComboBox()
+        self.export_layout.addItems(EXPORT_LAYOUTS)
+        self.export_layout.setToolTip("Long: one row per run and frequency\n"
+                                      "Wide: one row per frequency and one column per run, "
+                                      "with the parameter combinations in a separate table")
+        export_layout.addWidget(self.export_layout)
+        
+        self.excel_sheet_per_run = QCheckBox("Excel: one sheet per parameter combination")
+        export_layout.addWidget(self.excel_sheet_per_run)
+        
+        self.merge_projects = QCheckBox("Include added projects (Project column)")
+        self.merge_projects.setEnabled(False)
+        export_layout.addWidget(self.merge_projects)
+        
+        # Export button
+        self.exportButton = QPushButton("Export...")
+        self.exportButton.clicked.connect(self.exportData)
+        export_layout.addWidget(self.exportButton)
+        export_layout.addStretch()
+        export_group_layout.addLayout(export_layout)
+        
+        # Precision and compression of the text formats
+        text_layout = QHBoxLayout()
+        text_layout.addWidget(QLabel("Significant digits:"))
+        self.precision_digits = {}
+        for precision_type, label in (("frequency", "Frequency"), ("parameters", "Parameters"),
+                                      ("values", "Values")):
+            text_layout.addWidget(QLabel(label))
+            spinbox = QSpinBox()
+            spinbox.setRange(0, 17)
+            spinbox.setSpecialValueText("Full")
+            spinbox.setToolTip("Significant digits written to CSV and Touchstone files (Full: every digit)")
+            text_layout.addWidget(spinbox)
+            self.precision_digits[precision_type] = spinbox
+        
+        text_layout.addWidget(QLabel("Compression:"))
+        self.export_compression = QComboBox()
+        self.export_compression.addItems(["None"] + available_compressions())
+        self.export_compression.setToolTip("Compress CSV files while they are written")
+        text_layout.addWidget(self.export_compression)
+        text_layout.addStretch()
+        export_group_layout.addLayout(text_layout)
+        self.update_text_export_options(self.export_format.currentText())
+        
+        export_group.setLayout(export_group_layout)
+        data_layout.addWidget(export_group)
+
+        # Summary tab
+        summary_tab = QWidget()
+        summary_layout = QVBoxLayout(summary_tab)
+        
+        self.summary_text = QTextEdit()
+        self.summary_text.setReadOnly(True)
+        summary_layout.addWidget(self.summary_text)
+
+        # Performance tab
+        perf_tab = QWidget()
+        perf_layout = QVBoxLayout(perf_tab)
+        
+        self.perf_status = QLabel()
+        perf_layout.addWidget(self.perf_status)
+        
+        self.perf_table = QTableWidget(0, 6)
+        self.perf_table.setHorizontalHeaderLabels(
+            ["Stage", "Count", "Total (s)", "Mean (ms)", "Max (ms)", "Max RSS Growth (MB)"])
+        self.perf_table.horizontalHeader().setStretchLastSection(True)
+        self.perf_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        perf_layout.addWidget(self.perf_table)
+        
+        perf_button_layout = QHBoxLayout()
+        refresh_perf_button = QPushButton("Refresh")
+        refresh_perf_button.clicked.connect(self.refresh_performance)
+        reset_perf_button = QPushButton("Reset")
+        reset_perf_button.clicked.connect(self.reset_performance)
+        perf_button_layout.addWidget(refresh_perf_button)
+        perf_button_layout.addWidget(reset_perf_button)
+        perf_button_layout.addStretch()
+        perf_layout.addLayout(perf_button_layout)
+
+        # Exports tab
+        exports_tab = QWidget()
+        exports_layout = QVBoxLayout(exports_tab)
+        
+        self.exports_status = QLabel("Exports run in the background. Submit several to run them side by side.")
+        exports_layout.addWidget(self.exports_status)
+        
+        self.exports_table = QTableWidget(0, 6)
+        self.exports_table.setHorizontalHeaderLabels(
+            ["File", "Format", "Display Mode", "Progress", "Status", ""])
+        self.exports_table.horizontalHeader().setStretchLastSection(True)
+        self.exports_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        exports_layout.addWidget(self.exports_table)
+        
+        exports_button_layout = QHBoxLayout()
+        clear_exports_button = QPushButton("Clear Finished")
+        clear_exports_button.clicked.connect(self.clear_finished_exports)
+        exports_button_layout.addWidget(clear_exports_button)
+        exports_button_layout.addStretch()
+        exports_layout.addLayout(exports_button_layout)
+
+        # Add tabs to tab widget
+        self.tab_widget.addTab(data_tab, "Data")
+        self.tab_widget.addTab(summary_tab, "Summary")
+        self.tab_widget.addTab(perf_tab, "Performance")
+        self.tab_widget.addTab(exports_tab, "Exports")
+        self.refresh_performance()
+
+        # Style everything
+        self.apply_styles()
+
+    def apply_styles(self):
+        # Use monospace font
+        font = QtGui.QFont("Consolas", 9)
+        self.setFont(font)
+        
+        self.setStyleSheet("""
+            QMainWindow {
+                background: white;
+            }
+            QGroupBox {
+                font-family: Consolas;
+                font-weight: bold;
+                border: 1px solid #ddd;
+                border-radius: 5px;
+                margin-top: 1ex;
+                padding: 10px;
+                background: white;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 3px 0 3px;
+                color: #2c3e50;
+            }
+            QPushButton {
+                font-family: Consolas;
+                background-color: #4CAF50;
+                color: white;
+                border: none;
+                padding: 5px 15px;
+                border-radius: 3px;
+            }
+            QPushButton:hover {
+                background-color: #45a049;
+            }
+            QPushButton:pressed {
+                background-color: #3d8b40;
+            }
+            QLineEdit, QTextEdit {
+                font-family: Consolas;
+                padding: 5px;
+                border: 1px solid #ddd;
+                border-radius: 3px;
+            }
+            QComboBox {
+                font-family: Consolas;
+                padding: 5px;
+                border: 1px solid #ddd;
+                border-radius: 3px;
+            }
+            QLabel {
+                font-family: Consolas;
+            }
+            QTableView {
+                font-family: Consolas;
+            }
+        """)
+
+    def browse_export_path(self):
+        file_format = self.export_format.currentText()
+        file_filter = EXPORT_FILE_FILTERS[file_format]
+        file_ext = EXPORT_FORMATS[file_format]
+        
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save File",
+            "",
+            file_filter
+        )
+        if path:
+            if not path.endswith(file_ext):
+                path += file_ext
+            self.export_path.setText(path)
+
+    def update_summary(self, new_runs=None):
+        # With new_runs (appended by watch mode) only their statistics and lines are computed
+        if self.sweep is None:
+            return
+
+        with perf_recorder.span('update_summary'):
+            summary = []
+            summary.append("=== Data Summary ===\n")
+            
+            # Frequency range
+            summary.append(f"Frequency Range: {self.sweep.frequencies[0]:.6f} GHz to {self.sweep.frequencies[-1]:.6f} GHz")
+            summary.append(f"Number of Frequency Points: {self.sweep.n_freq}")
+            if self.spill_store.spilled:
+                summary.append(f"Memory-mapped to disk: {self.spill_store.spilled / 1024 ** 2:.1f} MB "
+                               f"(memory budget {self.spill_store.memory_budget / 1024 ** 2:.0f} MB)")
+            
+            # Parameters
+            if self.sweep.param_names:
+                summary.append(f"\nParameter Combinations: {self.sweep.n_runs}")
+                summary.append(f"Parameters: {', '.join(self.sweep.param_names)}")
+            
+            # Minimum and -10 dB band of the first loaded item for every run in one pass
+            label = self.sweep.labels[0]
+            if new_runs is None or self.summary_stats is None:
+                first_run = 0
+                self.summary_stats = compute_summary(self.sweep.frequencies, self.sweep.s_params)
+                self.summary_rows = []
+            else:
+                first_run = self.sweep.n_runs - new_runs.n_runs
+                self.summary_stats = append_summary(self.summary_stats,
+                                                    compute_summary(new_runs.frequencies, new_runs.items[label]))
+            stats = self.summary_stats
+            best_run = stats['best_run']
+            min_params = self.sweep.run_parameters(best_run)
+            
+            summary.append(f"\nMinimum {label}: {stats['min_db'][best_run]:.2f} dB at {stats['min_freq'][best_run]:.6f} GHz")
+            if min_params:
+                params_str = ", ".join(f"{k}={v}" for k, v in min_params.items())
+                summary.append(f"Parameters at minimum {label}: {params_str}")
+            
+            # Per-run table
+            summary.append(f"\n=== Per-Run Results ({BANDWIDTH_THRESHOLD_DB:.0f} dB bandwidth) ===\n")
+            summary.append(f"{'Run':>5}  {'Min ' + label + ' (dB)':>12}  {'Freq (GHz)':>11}  {'Band Start':>11}  "
+                           f"{'Band End':>11}  {'Bandwidth':>11}  Parameters")
+            for run_idx in range(first_run, self.sweep.n_runs):
+                band_start = stats['band_start'][run_idx]
+                band_end = stats['band_end'][run_idx]
+                params_str = ", ".join(f"{k}={v}" for k, v in self.sweep.run_parameters(run_idx).items())
+                self.summary_rows.append(f"{self.sweep.run_ids[run_idx]:>5}  {stats['min_db'][run_idx]:>12.2f}  {stats['min_freq'][run_idx]:>11.6f}  "
+                               f"{band_start:>11.6f}  {band_end:>11.6f}  {band_end - band_start:>11.6f}  {params_str}")
+            
+            self.summary_text.setText("\n".join(summary + self.summary_rows))
+
+    def exportData(self):
+        if self.view is None:
+            QtWidgets.QMessageBox.warning(self, "Error", "No data to export")
+            return
+        if not self.view.labels:
+            QtWidgets.QMessageBox.warning(self, "Error", "Check at least one S-parameter item to export")
+            return
+
+        try:
+            # Get file path from user
+            file_format = self.export_format.currentText()
+            file_filter = EXPORT_FILE_FILTERS[file_format]
+            file_ext = EXPORT_FORMATS[file_format]
+            
+            export_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Export Data",
+                "",
+                file_filter
+            )
+            
+            if not export_path:
+                return
+                
+            compression = self.compression()
+            if compression and export_path.endswith(COMPRESSIONS[compression]):
+                export_path = export_path[:-len(COMPRESSIONS[compression])]
+            if not export_path.endswith(file_ext):
+                export_path += file_ext
+            export_path = compressed_path(export_path, compression)
+
+            # Get selected columns
+            selected_columns = [col for col, checkbox in self.parameter_checkboxes.items() if checkbox.isChecked()]
+            
+            target = self.view
+            if self.merge_projects.isChecked() and self.extra_projects:
+                target = self.merged_view()
+                # Parameters only the added projects have are always exported
+                selected_columns = ([PROJECT_COLUMN] + selected_columns +
+                                    [name for name in target.param_names if name not in self.view.param_names])
+            self.submit_export(export_path, file_format, selected_columns, target)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to export data: {str(e)}")
+
+    def merged_view(self):
+        # The displayed view plus the same items and frequency range of every added project
+        labels = self.view.labels
+        for path, sweep in self.extra_projects.items():
+            missing = [label for label in labels if label not in sweep.items]
+            if missing:
+                raise ValueError(f"{os.path.basename(path)} has not loaded {', '.join(missing)} yet; "
+                                 f"export again once it has")
+        freq_start, freq_end = self.get_freq_range()
+        paths = [self.filePathLineEdit.text()] + list(self.extra_projects)
+        sweeps = [self.view] + [sweep.select_items([label for label in labels if label in sweep.items])
+                                .select_frequency_range(freq_start, freq_end)
+                                for sweep in self.extra_projects.values()]
+        return ProjectSweeps(zip(project_names(paths), sweeps))
+
+    def precision(self):
+        # Significant digits per column type; 0 ("Full") writes every digit
+        return {precision_type: spinbox.value() or None for precision_type, spinbox in self.precision_digits.items()}
+
+    def compression(self):
+        if self.export_format.currentText() != "CSV" or self.export_compression.currentText() == "None":
+            return None
+        return self.export_compression.currentText()
+
+    def update_text_export_options(self, file_format):
+        self.export_compression.setEnabled(file_format == "CSV")
+        for spinbox in self.precision_digits.values():
+            spinbox.setEnabled(file_format in ("CSV", "Touchstone", "Touchstone (ZIP)"))
+
+    def submit_export(self, export_path, file_format, selected_columns, target=None):
+        # Queues an export of the current settings; up to export_queue_workers (config.json)
+        # exports run at a time. Exports of the same view share its derived values.
+        job = {
+            'path': export_path,
+            'file_format': file_format,
+            'sweep': self.view if target is None else target,
+            'display_mode': self.display_mode.currentText(),
+            'selected_columns': selected_columns,
+            'stream': self.stream_export.isChecked(),
+            'excel_sheet_per_run': self.excel_sheet_per_run.isChecked(),
+            'layout': self.export_layout.currentText(),
+            'precision': self.precision(),
+            'compression': self.compression(),
+        }
+        worker = ExportWorker(job, self)
+        row = self.exports_table.rowCount()
+        self.exports_table.insertRow(row)
+        for col, text in enumerate([export_path, file_format, job['display_mode']]):
+            self.exports_table.setItem(row, col, QTableWidgetItem(text))
+        progress_bar = QProgressBar()
+        progress_bar.setMaximum(job['sweep'].n_runs)
+        self.exports_table.setCellWidget(row, 3, progress_bar)
+        self.exports_table.setItem(row, 4, QTableWidgetItem("Queued"))
+        cancel_button = QPushButton("Cancel")
+        self.exports_table.setCellWidget(row, 5, cancel_button)
+
+        entry = {'worker': worker, 'row': row, 'state': 'queued'}
+        worker.progress.connect(lambda done, total, bar=progress_bar: (bar.setMaximum(total), bar.setValue(done)))
+        worker.completed.connect(lambda completed, entry=entry: self.on_export_completed(entry, completed))
+        worker.failed.connect(lambda message, entry=entry: self.on_export_failed(entry, message))
+        worker.finished.connect(self.start_queued_exports)
+        cancel_button.clicked.connect(lambda checked=False, entry=entry: self.cancel_export(entry))
+        self.export_jobs.append(entry)
+        self.start_queued_exports()
+
+    def start_queued_exports(self):
+        slots = max(1, int(load_config().get('export_queue_workers', DEFAULT_EXPORT_QUEUE_WORKERS)))
+        running = sum(entry['state'] == 'running' for entry in self.export_jobs)
+        for entry in self.export_jobs:
+            if running >= slots:
+                break
+            if entry['state'] == 'queued':
+                entry['state'] = 'running'
+                self.set_export_status(entry, "Running")
+                entry['worker'].start()
+                running += 1
+        self.update_exports_status()
+
+    def set_export_status(self, entry, text, tooltip=None):
+        item = QTableWidgetItem(text)
+        item.setToolTip(tooltip or text)
+        self.exports_table.setItem(entry['row'], 4, item)
+        if entry['state'] not in ('queued', 'running'):
+            self.exports_table.removeCellWidget(entry['row'], 5)
+
+    def cancel_export(self, entry):
+        if entry['state'] == 'queued':
+            entry['state'] = 'cancelled'
+            self.set_export_status(entry, "Cancelled")
+            self.update_exports_status()
+        elif entry['state'] == 'running':
+            entry['worker'].cancel()
+            self.set_export_status(entry, "Cancelling...")
+
+    def on_export_completed(self, entry, completed):
+        job = entry['worker'].job
+        export_path, file_format = job['path'], job['file_format']
+        if completed:
+            entry['state'] = 'done'
+            message = f"Data exported to {export_path}"
+            if file_format == "Touchstone":
+                message = f"One Touchstone file per run written to {os.path.dirname(export_path)}"
+            if job['layout'] == "Wide" and file_format in ("CSV", "Parquet", "Feather"):
+                message += f"\nParameter combinations written to {parameter_sidecar_path(export_path)}"
+            progress_bar = self.exports_table.cellWidget(entry['row'], 3)
+            progress_bar.setValue(progress_bar.maximum())
+            self.set_export_status(entry, "Done", message)
+        else:
+            # write_export only replaces export_path once an export is complete
+            entry['state'] = 'cancelled'
+            self.set_export_status(entry, "Cancelled")
+        self.refresh_performance()
+
+    def on_export_failed(self, entry, message):
+        entry['state'] = 'failed'
+        self.set_export_status(entry, f"Failed: {message}")
+        QtWidgets.QMessageBox.critical(self, "Error", f"Failed to export data: {message}")
+
+    def update_exports_status(self):
+        running = sum(entry['state'] == 'running' for entry in self.export_jobs)
+        queued = sum(entry['state'] == 'queued' for entry in self.export_jobs)
+        title = "Exports"
+        if running or queued:
+            title += f" ({running} running, {queued} queued)" if queued else f" ({running} running)"
+        self.tab_widget.setTabText(self.tab_widget.indexOf(self.exports_table.parentWidget()), title)
+
+    def clear_finished_exports(self):
+        for entry in reversed(self.export_jobs):
+            if entry['state'] not in ('queued', 'running'):
+                self.exports_table.removeRow(entry['row'])
+                self.export_jobs.remove(entry)
+        for row, entry in enumerate(self.export_jobs):
+            entry['row'] = row
+
+    def closeEvent(self, event):
+        self.store_watched_runs()
+        # Queued exports are dropped and running ones cancelled and waited for, so no
+        # thread outlives the window
+        for entry in self.export_jobs:
+            try:
+                entry['worker'].finished.disconnect(self.start_queued_exports)
+            except TypeError:
+                pass
+            if entry['state'] == 'queued':
+                entry['state'] = 'cancelled'
+                self.set_export_status(entry, "Cancelled")
+        for entry in self.export_jobs:
+            if entry['state'] == 'running':
+                entry['worker'].cancel()
+                entry['worker'].wait()
+        super().closeEvent(event)
+
+    def load_cst_data(self):
+        self.store_watched_runs()
+        self.sweep = None
+        self.run_filter = self.run_filter_edit.text().strip() or None
+        try:
+            self.frequency_grid = self.selected_frequency_grid()
+        except ValueError:
+            QtWidgets.QMessageBox.warning(self, "Error", "Invalid frequency grid start or stop")
+            return
+        self.extra_projects = {}
+        self.merge_projects.setChecked(False)
+        self.update_projects_status()
+        self.start_load_worker(S11_RESULT_PATH, discover=True)
+
+    def selected_frequency_grid(self):
+        # None for the default grid (a linear grid for runs on different axes only)
+        kind = self.grid_mode.currentText()
+        if kind == "Reference Run":
+            return (kind, self.grid_run.value() or None)
+        if kind == "Linear":
+            start, stop = self.grid_start.text().strip(), self.grid_end.text().strip()
+            grid = (kind, float(start) if start else None, float(stop) if stop else None,
+                    self.grid_points.value() or None)
+            return None if grid == DEFAULT_FREQUENCY_GRID else grid
+        return (kind,)
+
+    def update_grid_options(self, kind):
+        self.grid_run.setEnabled(kind == "Reference Run")
+        for widget in (self.grid_start, self.grid_end, self.grid_points):
+            widget.setEnabled(kind == "Linear")
+
+    def load_sparameter_item(self, result_path):
+        # Loaded on the current runs and frequency axis, which watch mode may have grown
+        self.start_load_worker(result_path, discover=False, sweep=self.sweep)
+
+    def start_load_worker(self, result_path, discover, sweep=None):
+        if self.load_worker is not None and self.load_worker.isRunning():
+            return
+
+        config = load_config()
+        max_workers = config.get('load_workers', DEFAULT_LOAD_WORKERS)
+        self.load_worker = CSTLoadWorker(self.filePathLineEdit.text(), result_path, max_workers,
+                                         ResultCache.from_config(config), discover, self.run_filter,
+                                         self.spill_store, self.frequency_grid, sweep, self)
+
+        self.load_progress = QProgressDialog("Loading CST results...", "Cancel", 0, 0, self)
+        self.load_progress.setWindowTitle("Loading")
+        self.load_progress.setWindowModality(Qt.WindowModal)
+        self.load_progress.setMinimumDuration(0)
+        self.load_progress.canceled.connect(self.load_worker.cancel)
+
+        self.load_worker.progress.connect(self.on_load_progress)
+        self.load_worker.items_found.connect(self.on_items_found)
+        self.load_worker.loaded.connect(self.on_load_finished)
+        self.load_worker.failed.connect(self.on_load_failed)
+        self.load_worker.cancelled.connect(self.on_load_cancelled)
+        self.load_worker.start()
+
+    def on_load_progress(self, done, total):
+        self.load_progress.setMaximum(total)
+        self.load_progress.setValue(done)
+        self.load_progress.setLabelText(f"Loading run {done} of {total}...")
+
+    def on_items_found(self, result_paths):
+        self.sparameter_paths = {sparameter_label(path): path for path in result_paths}
+        self.sparameter_list.blockSignals(True)
+        self.sparameter_list.clear()
+        for label in self.sparameter_paths:
+            item = QListWidgetItem(label)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.sparameter_list.addItem(item)
+        self.sparameter_list.blockSignals(False)
+
+    def on_sparameter_toggled(self, item):
+        if self.sweep is None:
+            return
+        if item.checkState() == Qt.Checked and item.text() not in self.sweep.items:
+            self.load_sparameter_item(self.sparameter_paths[item.text()])
+        else:
+            self.update_display()
+
+    def active_labels(self):
+        labels = []
+        for row in range(self.sparameter_list.count()):
+            item = self.sparameter_list.item(row)
+            if item.checkState() == Qt.Checked and item.text() in self.sweep.items:
+                labels.append(item.text())
+        return labels if self.sparameter_list.count() else self.sweep.labels
+
+    def on_load_finished(self, result):
+        self.load_progress.close()
+        if self.sweep is not None:
+            # An additional S-parameter item of the loaded project
+            try:
+                self.sweep = self.sweep.with_items(result)
+                self.update_display()
+                self.load_missing_project_items()
+            except Exception as e:
+                QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load {', '.join(result.labels)}: {str(e)}")
+            return
+
+        self.sweep = result
+        self.sweep.derived_cache = DerivedCache.from_config(load_config())
+        self.sparameter_list.blockSignals(True)
+        for label in result.labels:
+            for item in self.sparameter_list.findItems(label, Qt.MatchExactly):
+                item.setCheckState(Qt.Checked)
+        self.sparameter_list.blockSignals(False)
+
+        # Update frequency range inputs
+        min_freq = float(np.min(self.sweep.frequencies))
+        max_freq = float(np.max(self.sweep.frequencies))
+        self.freq_start.setText(f"{min_freq:.6f}")
+        self.freq_end.setText(f"{max_freq:.6f}")
+
+        try:
+            self.update_display()
+            self.update_summary()
+            QtWidgets.QMessageBox.information(self, "Success", "CST file loaded successfully")
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load CST file: {str(e)}")
+
+    def on_load_failed(self, message):
+        self.load_progress.close()
+        QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load CST file: {message}")
+
+    def on_load_cancelled(self):
+        self.load_progress.close()
+        QtWidgets.QMessageBox.warning(self, "Cancelled", "Loading cancelled")
+
+    def apply_run_filter(self):
+        # Only the matching runs are read, so a changed filter reloads the project
+        if self.filePathLineEdit.text():
+            self.load_cst_data()
+
+    def apply_frequency_grid(self):
+        # Runs are resampled while they are loaded, so a changed grid reloads the project
+        if self.filePathLineEdit.text():
+            self.load_cst_data()
+
+    def add_projects(self):
+        if self.sweep is None:
+            QtWidgets.QMessageBox.warning(self, "Error", "Load a project first")
+            return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Add CST Projects", "", "CST Files (*.cst);;All Files (*)")
+        for path in paths:
+            if path == self.filePathLineEdit.text() or path in self.extra_projects:
+                continue
+            if not any(worker.project_path == path for worker in self.project_workers):
+                self.start_project_worker(path, self.sweep.labels)
+        self.update_projects_status()
+
+    def start_project_worker(self, path, labels, sweep=None):
+        config = load_config()
+        worker = CSTProjectWorker(path, [sparameter_result_path(label) for label in labels],
+                                  config.get('load_workers', DEFAULT_LOAD_WORKERS), ResultCache.from_config(config),
+                                  self.run_filter, self.spill_store, self.frequency_grid, sweep, self)
+        worker.loaded.connect(self.on_project_loaded)
+        worker.failed.connect(self.on_project_failed)
+        worker.finished.connect(lambda worker=worker: self.on_project_worker_finished(worker))
+        self.project_workers.append(worker)
+        worker.start()
+
+    def load_missing_project_items(self):
+        # Items checked since a project was added are loaded into it as well, unless a
+        # worker is already reading them
+        for path, sweep in self.extra_projects.items():
+            loading = {sparameter_label(result_path) for worker in self.project_workers
+                       if worker.project_path == path for result_path in worker.result_paths}
+            missing = [label for label in self.sweep.labels if label not in sweep.items and label not in loading]
+            if missing:
+                self.start_project_worker(path, missing, sweep)
+        self.update_projects_status()
+
+    def on_project_loaded(self, path, sweep):
+        if path in self.extra_projects:
+            # Further items of an added project; the sweep they were loaded into may have
+            # been extended by another worker since
+            sweep = self.extra_projects[path].with_items(sweep.select_items(
+                [label for label in sweep.labels if label not in self.extra_projects[path].items]))
+        else:
+            sweep.derived_cache = DerivedCache.from_config(load_config())
+        self.extra_projects[path] = sweep
+        self.load_missing_project_items()
+
+    def on_project_failed(self, path, message):
+        QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load {path}: {message}")
+
+    def on_project_worker_finished(self, worker):
+        self.project_workers.remove(worker)
+        self.update_projects_status()
+
+    def update_projects_status(self):
+        status = f"{len(self.extra_projects)} added" if self.extra_projects else ""
+        if self.project_workers:
+            status += f" ({len(self.project_workers)} loading)"
+        self.projects_status.setText(status.strip())
+        self.merge_projects.setEnabled(bool(self.extra_projects))
+
+    def toggle_watch(self, enabled):
+        if enabled:
+            interval = float(load_config().get('watch_interval_s', DEFAULT_WATCH_INTERVAL_S))
+            self.watch_timer.start(int(interval * 1000))
+            self.watch_status.setText("Watching")
+        else:
+            self.watch_timer.stop()
+            self.watch_status.setText("")
+            self.store_watched_runs()
+
+    def check_new_runs(self):
+        if self.sweep is None:
+            return
+        if self.load_worker is not None and self.load_worker.isRunning():
+            return
+        if self.watch_worker is not None and self.watch_worker.isRunning():
+            return
+        max_workers = load_config().get('load_workers', DEFAULT_LOAD_WORKERS)
+        self.watch_worker = CSTWatchWorker(self.filePathLineEdit.text(), self.sweep, max_workers,
+                                           self.run_filter, self)
+        self.watch_worker.loaded.connect(self.on_new_runs)
+        self.watch_worker.failed.connect(self.on_watch_failed)
+        self.watch_worker.start()
+
+    def on_new_runs(self, sweep, new_runs):
+        # Results for a sweep that has since been replaced, or grown by another item, are dropped
+        if sweep is not self.sweep or new_runs is None or set(new_runs.labels) != set(sweep.labels):
+            return
+        try:
+            self.sweep.append_runs(new_runs)
+        except ValueError as e:
+            self.watch_status.setText(f"Watch failed: {str(e)}")
+            return
+        # A run-filtered sweep is partial, and the cache only holds whole sweeps. Writing
+        # it rewrites the whole entry, so that waits until watching stops (store_watched_runs).
+        if not self.run_filter:
+            self.pending_cache = (self.filePathLineEdit.text(), self.frequency_grid)
+        self.watch_status.setText(f"{self.sweep.n_runs} runs (+{new_runs.n_runs} at {time.strftime('%H:%M:%S')})")
+        self.update_display()
+        self.update_summary(new_runs)
+
+    def store_watched_runs(self):
+        # Writes a sweep grown by watch mode to the result cache once, when watching stops,
+        # another project is loaded or the window closes
+        pending, self.pending_cache = self.pending_cache, None
+        cache = ResultCache.from_config(load_config()) if pending and self.sweep is not None else None
+        if cache is None:
+            return
+        project_path, frequency_grid = pending
+        try:
+            for label in self.sweep.labels:
+                cache.store(project_path, sparameter_result_path(label), self.sweep.select_items([label]),
+                            frequency_grid)
+        except OSError:
+            pass
+
+    def on_watch_failed(self, message):
+        self.watch_status.setText(f"Watch failed: {message}")
+
+    def toggle_freq_range(self, state):
+        self.freq_start.setEnabled(not state)
+        self.freq_end.setEnabled(not state)
+        self.apply_freq_range.setEnabled(not state)
+        self.update_display()
+
+    def create_header_checkboxes(self, columns):
+        # Clear existing header layout
+        while self.header_layout.count():
+            item = self.header_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        
+        self.parameter_checkboxes = {}
+        
+        # Create a widget for each column with better styling
+        for col in columns:
+            container = QWidget()
+            container_layout = QHBoxLayout()
+            container_layout.setContentsMargins(5, 2, 5, 2)
+            container_layout.setSpacing(5)
+            
+            checkbox = QCheckBox()
+            checkbox.setChecked(True)
+            checkbox.setStyleSheet("""
+                QCheckBox {
+                    spacing: 5px;
+                }
+                QCheckBox::indicator {
+                    width: 15px;
+                    height: 15px;
+                }
+                QCheckBox::indicator:unchecked {
+                    border: 2px solid #999;
+                    background: white;
+                }
+                QCheckBox::indicator:checked {
+                    border: 2px solid #4CAF50;
+                    background: #4CAF50;
+                }
+            """)
+            
+            label = QLabel(col)
+            label.setStyleSheet("""
+                QLabel {
+                    color: #2c3e50;
+                    font-weight: bold;
+                    padding: 2px;
+                    background: #f8f9fa;
+                    border-radius: 3px;
+                }
+            """)
+            
+            container_layout.addWidget(checkbox)
+            container_layout.addWidget(label)
+            container_layout.addStretch()
+            
+            container.setLayout(container_layout)
+            container.setStyleSheet("""
+                QWidget {
+                    background: #f8f9fa;
+                    border-bottom: 1px solid #dee2e6;
+                }
+            """)
+            
+            self.header_layout.addWidget(container)
+            self.parameter_checkboxes[col] = checkbox
+        
+        # Style the table
+        self.tableView.setStyleSheet("""
+            QTableView {
+                gridline-color: #ddd;
+                selection-background-color: #e3f2fd;
+            }
+            QTableView::item {
+                padding: 5px;
+            }
+            QTableView::item:selected {
+                background-color: #e3f2fd;
+                color: black;
+            }
+            QHeaderView::section {
+                background-color: #f8f9fa;
+                padding: 5px;
+                border: 1px solid #dee2e6;
+                font-weight: bold;
+                color: #2c3e50;
+            }
+        """)
+        
+        # Hide default header and set alternating row colors
+        self.tableView.horizontalHeader().hide()
+        self.tableView.setAlternatingRowColors(True)
+        self.tableView.setStyleSheet(self.tableView.styleSheet() + """
+            QTableView {
+                alternate-background-color: #f8f9fa;
+                background-color: white;
+            }
+        """)
+        
+        # Set fixed column widths
+        header_width = 150  # Fixed width for each column
+        for i in range(len(columns)):
+            self.tableView.setColumnWidth(i, header_width)
+
+    def get_freq_range(self):
+        try:
+            if self.use_all_freq.isChecked():
+                return None, None
+            else:
+                start = float(self.freq_start.text().replace(',', '.'))
+                end = float(self.freq_end.text().replace(',', '.'))
+                return start, end
+        except:
+            return None, None
+
+    def update_display(self):
+        if self.sweep is None:
+            return
+
+        # Get frequency range
+        freq_start, freq_end = self.get_freq_range()
+        
+        # Item and range selection return a view on the loaded sweep, not a copy
+        self.view = self.sweep.select_items(self.active_labels()).select_frequency_range(freq_start, freq_end)
+        self.run_filter_status.setText(f"{self.sweep.n_runs} matching runs" if self.run_filter
+                                       else f"{self.sweep.n_runs} runs")
+
+        display_mode = self.display_mode.currentText()
+        headers = ([FREQUENCY_COLUMN] + self.view.param_names +
+                   [name for name, _, _ in value_columns(display_mode, self.view.labels)])
+
+        # The model formats cells lazily, so the full filtered dataset is shown
+        with perf_recorder.span('table_build'):
+            self.results_model.set_data(self.view, display_mode, self.preview_points.value())
+            self.create_header_checkboxes(headers)
+        self.refresh_performance()
+
+    def browseFile(self):
+        filePath, _ = QFileDialog.getOpenFileName(self, "Select CST File", "", "CST Files (*.cst);;All Files (*)")
+        if filePath:
+            self.filePathLineEdit.setText(filePath)
+            self.load_cst_data()
+
+    def change_library_path(self):
+        if setup_cst_path(self):
+            QtWidgets.QMessageBox.information(self, "Success", 
+                "CST Library path updated successfully.\nPlease restart the application for changes to take effect.")
+
+    def clear_result_cache(self):
+        cache = ResultCache.from_config(load_config())
+        if cache is None:
+            QtWidgets.QMessageBox.information(self, "Cache", "The result cache is disabled in config.json.")
+            return
+        try:
+            cache.clear()
+            QtWidgets.QMessageBox.information(self, "Success", f"Result cache cleared ({cache.cache_dir})")
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to clear cache: {str(e)}")
+
+    def record_startup(self):
+        # Time from process start (the import of cst2csv) to the first shown window
+        perf_recorder.record('startup', time.perf_counter() - STARTUP_START)
+        self.refresh_performance()
+
+    def toggle_performance_monitoring(self, enabled):
+        config = load_config()
+        config['perf_enabled'] = enabled
+        save_config(config)
+        perf_recorder.configure_from_config(config)
+        self.refresh_performance()
+
+    def toggle_single_precision(self, enabled):
+        config = load_config()
+        config['spill_dtype'] = "complex64" if enabled else "complex128"
+        save_config(config)
+        self.spill_store.dtype = np.dtype(np.complex64 if enabled else np.complex128)
+
+    def reset_performance(self):
+        perf_recorder.reset()
+        self.refresh_performance()
+
+    def refresh_performance(self):
+        if perf_recorder.enabled:
+            self.perf_status.setText("Monitoring is on. Spans are also appended to the performance log.")
+        else:
+            self.perf_status.setText("Monitoring is off. Enable it under Settings > Performance Monitoring.")
+        stats = perf_recorder.snapshot()
+        self.perf_table.setRowCount(len(stats))
+        for row, (stage, stat) in enumerate(stats.items()):
+            values = [stage, str(stat['count']), f"{stat['total']:.3f}",
+                      f"{1000 * stat['total'] / stat['count']:.2f}", f"{1000 * stat['max']:.2f}",
+                      f"{stat['rss_growth'] / (1024 * 1024):.1f}" if stat['rss_growth'] is not None else "n/a"]
+            for col, value in enumerate(values):
+                self.perf_table.setItem(row, col, QTableWidgetItem(value))
+
+def run_gui():
+    app = QApplication(sys.argv)
+    perf_recorder.configure_from_config(load_config())
+    with perf_recorder.span('setup_cst_path'):
+        cst_ready = setup_cst_path()
+    if cst_ready:
+        mainWin = CSTExportApp()
+        mainWin.show()
+        # Runs once the window has been painted
+        QTimer.singleShot(0, mainWin.record_startup)
+        return app.exec_()
+    return 1